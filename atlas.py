@@ -0,0 +1,93 @@
+import pygame
+import glob
+import json
+import os
+
+ATLAS_DIR = os.path.join("assets", "atlas")
+
+ENEMY_ROOT  = os.path.join("assets", "enemy")
+ENEMY_SIZE  = 150
+TOWER_ROOT  = os.path.join("assets", "tower")
+TOWER_SIZE  = 50
+
+
+# ─── Builder (offline) ──────────────────────────────────────
+
+def _load_scaled(files, size):
+    return [pygame.transform.scale(pygame.image.load(fn), (size, size))
+            for fn in files]
+
+def _pack(name, sequences, size, out_dir):
+    """Write one atlas image with a row per sequence, plus its index."""
+    cols = max(len(frames) for frames in sequences.values())
+    rows = len(sequences)
+    sheet = pygame.Surface((cols * size, rows * size), pygame.SRCALPHA)
+
+    index = {"image": f"{name}.png", "size": size, "sequences": {}}
+    for row, (seq, frames) in enumerate(sequences.items()):
+        rects = []
+        for col, frame in enumerate(frames):
+            x, y = col * size, row * size
+            sheet.blit(frame, (x, y))
+            rects.append([x, y, size, size])
+        index["sequences"][seq] = rects
+
+    os.makedirs(out_dir, exist_ok=True)
+    pygame.image.save(sheet, os.path.join(out_dir, index["image"]))
+    with open(os.path.join(out_dir, f"{name}.json"), "w") as f:
+        json.dump(index, f)
+    return index
+
+def build_enemy_atlas(kind, size=ENEMY_SIZE, out_dir=ATLAS_DIR):
+    """Pack assets/enemy/<kind>/{right,left} into one pre-scaled sheet."""
+    folder = os.path.join(ENEMY_ROOT, kind)
+    right = _load_scaled(sorted(glob.glob(os.path.join(folder, "right", "*.png"))), size)
+    left  = _load_scaled(sorted(glob.glob(os.path.join(folder, "left",  "*.png"))), size)
+    if not left:
+        # pre-flip right into left, same as the runtime loader
+        left = [pygame.transform.flip(f, True, False) for f in right]
+    return _pack(kind, {"right": right, "left": left}, size, out_dir)
+
+def build_tower_atlas(size=TOWER_SIZE, out_dir=ATLAS_DIR):
+    """Pack every assets/tower/*.png into a single-row sheet."""
+    files = sorted(glob.glob(os.path.join(TOWER_ROOT, "*.png")))
+    sequences = {}
+    for fn, frame in zip(files, _load_scaled(files, size)):
+        sequences[os.path.basename(fn)] = [frame]
+    return _pack("towers", sequences, size, out_dir)
+
+def build_all(out_dir=ATLAS_DIR):
+    kinds = sorted(d for d in os.listdir(ENEMY_ROOT)
+                   if os.path.isdir(os.path.join(ENEMY_ROOT, d)))
+    for kind in kinds:
+        build_enemy_atlas(kind, out_dir=out_dir)
+        print(f"[atlas] {kind}")
+    build_tower_atlas(out_dir=out_dir)
+    print("[atlas] towers")
+
+
+# ─── Runtime loader ─────────────────────────────────────────
+
+def load_atlas(name, size, atlas_dir=None):
+    """Return {sequence: [Surface, ...]} sliced from a packed atlas.
+
+    Returns None when no atlas was built for `name` at this size, so
+    callers can fall back to the loose PNG tree.
+    """
+    atlas_dir = atlas_dir or ATLAS_DIR
+    index_path = os.path.join(atlas_dir, f"{name}.json")
+    if not os.path.exists(index_path):
+        return None
+    with open(index_path) as f:
+        index = json.load(f)
+    if index.get("size") != size:
+        return None
+
+    sheet = pygame.image.load(os.path.join(atlas_dir, index["image"]))
+    sheet = sheet.convert_alpha() if pygame.display.get_surface() else sheet
+    return {seq: [sheet.subsurface(pygame.Rect(r)) for r in rects]
+            for seq, rects in index["sequences"].items()}
+
+
+if __name__ == "__main__":
+    build_all()
@@ -0,0 +1,310 @@
+"""Headless batch simulator for wave-balance sweeps.
+
+Runs many complete games of one level across a process pool and streams
+one JSON line per game (with its per-wave stats) to disk. Each worker
+parses the map once and reuses it for every game it plays.
+
+    python batch_sim.py --map assets/maps/level1.tmx --strategy greedy \\
+        --grid '{"wave_growth": [2, 3], "tower_costs.archer": [25, 30, 35]}' \\
+        --runs 20 --out results.jsonl
+
+Grid keys are Simulation attributes (`wave_base`, `wave_growth`,
+`spawn_interval`, `enemy_health_scale`, `enemy_speed_scale`,
+`player_money`, ...) or `tower_costs.<kind>`. `--grid` also accepts a
+path to a JSON file. Rerun with `--resume` to skip games already in
+`--out`: a game is known by its parameters, repeat number and seed, so
+the grid or `--runs` may change between runs, but the rest of the sweep
+configuration may not.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from multiprocessing import Pool
+
+import enemy
+from maps import Map
+from simulation import Simulation, TOWER_TYPES
+
+
+# ─── Placement strategies ────────────────────────────────────
+
+def _coverage(route, slot, radius, step=10):
+    """How many path samples a tower at `slot` can reach."""
+    r2 = radius * radius
+    hits, s = 0, 0.0
+    while s <= route.length:
+        x, y = route.position_at(s)
+        if (x - slot[0]) ** 2 + (y - slot[1]) ** 2 <= r2:
+            hits += 1
+        s += step
+    return hits
+
+
+def rank_slots(route, slots, radius=100):
+    """Tower slots ordered by how much path they cover, best first."""
+    return sorted(slots, key=lambda s: -_coverage(route, s, radius))
+
+
+def strategy_none(sim, rng, slots):
+    pass
+
+
+def strategy_random(sim, rng, slots):
+    """Buy random towers on random free slots while money allows."""
+    while True:
+        free  = [s for s in slots if s not in sim.occupied_slots]
+        kinds = [k for k, c in sim.tower_costs.items() if c <= sim.player_money]
+        if not free or not kinds:
+            return
+        sim.place_tower(rng.choice(kinds), rng.choice(free))
+
+
+def strategy_greedy(sim, rng, slots):
+    """Most expensive affordable damage tower on the free slot covering
+    the most path; once slots run out, upgrade the cheapest tower."""
+    while True:
+        free  = [s for s in slots if s not in sim.occupied_slots]
+        kinds = sorted((c, k) for k, c in sim.tower_costs.items()
+                       if k != "ice" and c <= sim.player_money)
+        if free and kinds:
+            sim.place_tower(kinds[-1][1], free[0])
+            continue
+        if free or not sim.towers:
+            return
+        tw = min(sim.towers, key=lambda t: t.upgrade_cost if t.level < 5 else 1e18)
+        if not sim.upgrade_tower(tw):
+            return
+
+
+STRATEGIES = {
+    "none":   strategy_none,
+    "random": strategy_random,
+    "greedy": strategy_greedy,
+}
+
+
+# ─── Parameter grid ──────────────────────────────────────────
+
+def load_grid(spec):
+    if not spec:
+        return {}
+    if os.path.exists(spec):
+        with open(spec) as f:
+            return json.load(f)
+    return json.loads(spec)
+
+
+def expand_grid(grid):
+    """Every combination of the grid values, as a list of dicts."""
+    keys = sorted(grid)
+    values = [v if isinstance(v, list) else [v] for v in (grid[k] for k in keys)]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def apply_params(sim, params):
+    for key, value in params.items():
+        if key.startswith("tower_costs."):
+            kind = key.split(".", 1)[1]
+            if kind not in TOWER_TYPES:
+                raise ValueError(f"unknown tower kind: {kind}")
+            sim.tower_costs[kind] = value
+        elif hasattr(sim, key):
+            setattr(sim, key, value)
+        else:
+            raise ValueError(f"unknown simulation parameter: {key}")
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def run_seed(base_seed, params, repeat):
+    """Seed derived from the game's parameters and repeat number alone,
+    so reruns and resumes match wherever the point sits in the grid."""
+    return zlib.crc32(f"{base_seed}:{_params_key(params)}:{repeat}".encode())
+
+
+def sweep_id(config):
+    """Short digest of everything but the grid that shapes a game."""
+    return "%08x" % zlib.crc32(json.dumps(config, sort_keys=True).encode())
+
+
+# ─── Worker ──────────────────────────────────────────────────
+
+_map    = None
+_slots  = None
+_config = None
+
+
+def _init_worker(map_path, config):
+    global _map, _slots, _config
+    _map    = Map(None, map_path, load_images=False)
+    _slots  = rank_slots(_map.route, _map.get_tower_points())
+    _config = config
+
+
+def play(job):
+    """Run one game to victory, defeat or the tick limit."""
+    run_id, repeat, params = job
+    cfg  = _config
+    seed = run_seed(cfg["seed"], params, repeat)
+    rng  = random.Random(seed)
+
+    sim = Simulation(_map.route, list(_slots),
+                     base_enemy_types=[getattr(enemy, n) for n in cfg["roster"]],
+                     boss_class=getattr(enemy, cfg["boss"]),
+                     start_wave=cfg["start_wave"],
+                     final_wave=cfg["final_wave"],
+                     projectile_mode=cfg["projectile_mode"],
+                     routes=_map.routes)
+    apply_params(sim, params)
+    place = STRATEGIES[cfg["strategy"]]
+
+    waves = []
+    while not (sim.victory or sim.game_over) and sim.clock.ticks < cfg["max_ticks"]:
+        if not sim.wave_in_progress and not sim.manual_wave_trigger:
+            place(sim, rng, _slots)
+            sim.request_wave()
+        sim.tick()
+        for name, payload in sim.drain_events():
+            if name == "wave_cleared":
+                waves.append(dict(payload, health=sim.health, money=sim.player_money,
+                                  towers=len(sim.towers)))
+
+    outcome = "victory" if sim.victory else "defeat" if sim.game_over else "timeout"
+    return {
+        "run_id":   run_id,
+        "repeat":   repeat,
+        "seed":     seed,
+        "sweep":    sweep_id(cfg),
+        "level":    cfg["level"],
+        "params":   params,
+        "strategy": cfg["strategy"],
+        "outcome":  outcome,
+        "wave":     sim.wave,
+        "health":   sim.health,
+        "money":    sim.player_money,
+        "ticks":    sim.clock.ticks,
+        "waves":    waves,
+    }
+
+
+# ─── Driver ──────────────────────────────────────────────────
+
+def _done_games(path):
+    """({(params, repeat, seed)} of the games in `path`, {sweep ids})."""
+    done, sweeps = set(), set()
+    if not os.path.exists(path):
+        return done, sweeps
+    with open(path) as f:
+        for line in f:
+            try:
+                game = json.loads(line)
+            except ValueError:
+                continue  # partial last line from an interrupted run
+            sweeps.add(game.get("sweep"))
+            done.add((_params_key(game.get("params")), game.get("repeat"), game.get("seed")))
+    return done, sweeps
+
+
+def _drop_partial_line(path, chunk=4096):
+    """Cut an interrupted run's unterminated last line, so the next
+    result starts on a line of its own."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - chunk)
+            f.seek(start)
+            nl = f.read(pos - start).rfind(b"\n")
+            if nl >= 0:
+                pos = start + nl + 1
+                break
+            pos = start
+        if pos != end:
+            f.truncate(pos)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--map", default="assets/maps/level1.tmx")
+    parser.add_argument("--roster", default="Goblin,Orc,Troll",
+                        help="comma-separated enemy class names")
+    parser.add_argument("--boss", default="Boss")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="greedy")
+    parser.add_argument("--grid", default="", help="JSON object or file of param -> values")
+    parser.add_argument("--runs", type=int, default=10, help="games per grid point")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start-wave", type=int, default=0)
+    parser.add_argument("--final-wave", type=int, default=15)
+    parser.add_argument("--max-ticks", type=int, default=200_000)
+    parser.add_argument("--projectile-mode", default="predictive",
+                        choices=("homing", "predictive", "instant"))
+    parser.add_argument("--out", default="results.jsonl")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip games already present in --out")
+    args = parser.parse_args(argv)
+
+    roster = [n.strip() for n in args.roster.split(",") if n.strip()]
+    for name in roster + [args.boss]:
+        if not isinstance(getattr(enemy, name, None), type):
+            parser.error(f"unknown enemy class: {name}")
+
+    config = {
+        "level":           os.path.splitext(os.path.basename(args.map))[0],
+        "roster":          roster,
+        "boss":            args.boss,
+        "strategy":        args.strategy,
+        "seed":            args.seed,
+        "start_wave":      args.start_wave,
+        "final_wave":      args.final_wave,
+        "max_ticks":       args.max_ticks,
+        "projectile_mode": args.projectile_mode,
+    }
+
+    points = expand_grid(load_grid(args.grid))
+    jobs = [(p * args.runs + r, r, params)
+            for p, params in enumerate(points) for r in range(args.runs)]
+    if args.resume:
+        _drop_partial_line(args.out)
+        done, sweeps = _done_games(args.out)
+        if sweeps - {sweep_id(config)}:
+            parser.error(f"{args.out} was written with different sweep settings "
+                         "(map, roster, strategy, seed, waves, ...); choose another --out")
+        jobs = [j for j in jobs
+                if (_params_key(j[2]), j[1], run_seed(args.seed, j[2], j[1])) not in done]
+    elif os.path.exists(args.out):
+        parser.error(f"{args.out} exists; pass --resume or choose another --out")
+
+    total = len(jobs)
+    print(f"{len(points)} grid points x {args.runs} runs, {total} to play "
+          f"on {args.workers} workers", file=sys.stderr)
+    if not total:
+        return
+
+    t0 = time.perf_counter()
+    wins = 0
+    with open(args.out, "a") as out, \
+         Pool(args.workers, _init_worker, (args.map, config)) as pool:
+        for done, result in enumerate(pool.imap_unordered(play, jobs, chunksize=4), 1):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            wins += result["outcome"] == "victory"
+            elapsed = time.perf_counter() - t0
+            eta = elapsed / done * (total - done)
+            print(f"\r{done}/{total} games  {done / elapsed:.1f}/s  "
+                  f"win rate {wins / done:.0%}  eta {eta:.0f}s ",
+                  end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
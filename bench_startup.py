@@ -0,0 +1,68 @@
+"""Cold-start benchmark: loose PNG tree vs. packed atlas.
+
+Each sample runs in a fresh interpreter so no in-process cache survives
+between measurements. Build the atlas first with `python atlas.py`.
+
+    python bench_startup.py [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def _measure(mode):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    import atlas
+    if mode == "png":
+        atlas.ATLAS_DIR = os.path.join("assets", "__no_atlas__")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+    from enemy import (Goblin, Orc, Troll, Boss,
+                       Slime, Werewolf, Werebear, OrcRider,
+                       preload_enemy_frames)
+    from tower import load_tower_image
+
+    roster = [Goblin, Orc, Troll, Boss, Slime, Werewolf, Werebear, OrcRider]
+    t0 = time.perf_counter()
+    preload_enemy_frames(roster)
+    for fn in ("archer_tower.png", "tower.png", "magic_tower.png", "ice_tower.png"):
+        load_tower_image(fn)
+    cold = time.perf_counter() - t0
+
+    # second pass is served entirely from the in-process caches
+    t0 = time.perf_counter()
+    preload_enemy_frames(roster)
+    for fn in ("archer_tower.png", "tower.png", "magic_tower.png", "ice_tower.png"):
+        load_tower_image(fn)
+    warm = time.perf_counter() - t0
+    print(f"{cold} {warm}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--mode", choices=("png", "atlas"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        _measure(args.mode)
+        return
+
+    for mode in ("png", "atlas"):
+        cold, warm = [], []
+        for _ in range(args.runs):
+            out = subprocess.run([sys.executable, __file__, "--mode", mode],
+                                 capture_output=True, text=True, check=True)
+            c, w = map(float, out.stdout.split()[-2:])
+            cold.append(c); warm.append(w)
+        print(f"{mode:>5}: cold {statistics.median(cold)*1000:8.2f} ms   "
+              f"warm {statistics.median(warm)*1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Tower targeting benchmark: linear scan vs. SpatialGrid.
+
+Sweeps tower and enemy counts over a level's real path and tower slots
+(towers are tiled over the map when there are more than slots).
+
+    python bench_targeting.py [--map assets/maps/level1.tmx]
+"""
+import argparse
+import random
+import time
+
+from maps import Map
+from enemy import Goblin
+from tower import ArcherTower
+from spatial import SpatialGrid
+
+
+def _scatter(route, n, rng):
+    enemies = []
+    for _ in range(n):
+        e = Goblin(route)
+        e.distance = rng.random() * route.length
+        e.current_point = route.segment_at(e.distance)
+        e.x, e.y = route.position(e.distance, e.current_point)
+        enemies.append(e)
+    return enemies
+
+
+def _towers(m, n, rng):
+    w, h = m.get_size()
+    pts = list(m.get_tower_points())
+    while len(pts) < n:
+        pts.append((rng.randrange(w), rng.randrange(h)))
+    return [ArcherTower(x, y) for x, y in pts[:n]]
+
+
+def _time(fn, repeats):
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - t0) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--map", default="assets/maps/level1.tmx")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    m = Map(None, args.map, load_images=False)
+    grid = SpatialGrid()
+
+    print(f"{'towers':>6} {'enemies':>8} {'linear ms':>10} {'grid ms':>9} {'speedup':>8}")
+    for n_towers in (4, 16, 64):
+        for n_enemies in (50, 500, 5000):
+            enemies = _scatter(m.route, n_enemies, rng)
+            towers  = _towers(m, n_towers, rng)
+
+            def linear():
+                for t in towers:
+                    t.acquire_target(enemies)
+
+            def indexed():
+                grid.rebuild(enemies)
+                for t in towers:
+                    t.acquire_target(enemies, grid)
+
+            lin = _time(linear, args.repeats)
+            idx = _time(indexed, args.repeats)
+            print(f"{n_towers:>6} {n_enemies:>8} {lin:>10.3f} {idx:>9.3f} {lin/idx:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,100 +1,118 @@
 import pygame
-import math
 import glob
 import os
+from collections import OrderedDict
+from atlas import load_atlas
+from route import Route
+import tracing
 
 class Enemy:
-    def __init__(self, path):
-        if not path:
-            raise ValueError("Enemy path is empty. Ensure your TMX map defines a proper path.")
-        # Path & movement
-        self.path = path
-        self.current_point = 0
-        self.x, self.y = path[0]
+    sprite_folder = None
+    sprite_size   = 150
+
+    # Base stats; subclasses override
+    max_health = 100
+    base_speed = 1.0
+
+    def __init__(self, route):
+        # Movement: a scalar distance along a Route shared by all enemies
+        # (a plain list of points is wrapped, but then not shared)
+        self.route = route if isinstance(route, Route) else Route(route)
+        self.distance = 0.0
+        self.current_point = 0   # last waypoint passed
+        self.x, self.y = self.route.points[0]
+        # position at the previous tick, for interpolated drawing
+        self.prev_x, self.prev_y = self.x, self.y
         self.alive = True
 
         # Health
-        self.health = 100
-        self.max_health = 100
+        self.health = self.max_health
 
         # Speed + slow
-        self.speed = 1.0
+        self.speed = self.base_speed
         self.original_speed = self.speed
         self.slow_until = 0
 
-        # which way we're facing
-        self.frames_right = []
-        self.frames_left  = []
-        self.frames       = self.frames_right
+        # which way we're facing; frames are decoded lazily on first draw
+        # so a headless simulation never touches image files
+        self.facing_left = False
+        self.frames_right = None
+        self.frames_left  = None
 
         # Animation timing
         self.frame_index    = 0
         self.frame_interval = 100
-        self.last_frame_time = pygame.time.get_ticks()
+        self.last_frame_time = 0
 
-        # fallback circle
-        self.image = pygame.Surface((20,20), pygame.SRCALPHA)
-        pygame.draw.circle(self.image, (255,0,0), (10,10), 10)
+    @property
+    def frames(self):
+        if self.frames_right is None:
+            self.load_sprites()
+        return self.frames_left if self.facing_left else self.frames_right
 
-    def update_animation(self, now):
-        if not self.frames:
+    def load_sprites(self):
+        if self.sprite_folder is None:
+            self.frames_right = self.frames_left = []
             return
+        r, l = load_bidirectional_frames(self.sprite_folder, self.sprite_size)
+        self.frames_right = r
+        self.frames_left  = l
+
+    def update_animation(self, now):
         if now - self.last_frame_time >= self.frame_interval:
-            self.frame_index = (self.frame_index + 1) % len(self.frames)
+            self.frame_index += 1
             self.last_frame_time = now
 
-    def move(self, time_multiplier=1.0):
-        now = pygame.time.get_ticks()
+    def move(self, now, step_scale=1.0):
+        """Advance one simulation tick; `now` is simulation time in ms."""
+        self.prev_x, self.prev_y = self.x, self.y
         self.update_animation(now)
 
         # revert any slow
         if now > self.slow_until:
             self.speed = self.original_speed
 
-        # end of path?
-        if self.current_point + 1 >= len(self.path):
-            self.alive = False
+        # end of path? the simulation counts this as a leak
+        route = self.route
+        if self.distance >= route.length:
             return
 
-        # step & direction
-        step = self.speed * time_multiplier
-        tx, ty = self.path[self.current_point + 1]
-        dx, dy = tx - self.x, ty - self.y
-        dist = math.hypot(dx, dy)
-        if dist != 0:
-            dx /= dist
-            dy /= dist
+        # advance along the shared route
+        self.distance = min(self.distance + self.speed * step_scale, route.length)
+        self.current_point = route.locate(self.distance, self.current_point)
+        self.x, self.y = route.position(self.distance, self.current_point)
 
         # choose frames based on x‐direction
-        if dx < 0:
-            self.frames = self.frames_left
-        else:
-            self.frames = self.frames_right
+        self.facing_left = route.direction(self.current_point)[0] < 0
 
-        # move
-        self.x += dx * step
-        self.y += dy * step
+    def time_to_goal(self, step_scale=1.0):
+        """Ticks until this enemy reaches the goal at its current speed."""
+        return self.route.time_to_goal(self.distance, self.speed * step_scale)
 
-        # snap if close
-        if dist <= step:
-            self.current_point += 1
-            self.x, self.y = float(tx), float(ty)
+    def draw(self, surface, alpha=1.0):
+        """Draw sprite + health bar; returns the screen rect touched.
 
-    def draw(self, surface):
-        if self.frames:
-            frame = self.frames[self.frame_index]
+        `alpha` interpolates between the last two ticks' positions.
+        """
+        x = int(self.prev_x + (self.x - self.prev_x) * alpha)
+        y = int(self.prev_y + (self.y - self.prev_y) * alpha)
+        frames = self.frames
+        if frames:
+            frame = frames[self.frame_index % len(frames)]
             w, h = frame.get_size()
-            surface.blit(frame, (int(self.x)-w//2, int(self.y)-h//2))
+            dirty = surface.blit(frame, (x-w//2, y-h//2))
         else:
-            surface.blit(self.image, (int(self.x)-10, int(self.y)-10))
+            h = 20
+            dirty = surface.blit(_fallback_image(), (x-10, y-10))
 
         # health bar
         bar_w, bar_h = 20, 4
         health_ratio = max(self.health,0)/self.max_health
-        bx = int(self.x)-bar_w//2
-        by = int(self.y)-(h//2)-6
-        pygame.draw.rect(surface, (150,0,0), (bx,by,bar_w,bar_h))
+        bx = x-bar_w//2
+        by = y-(h//2)-6
+        bar = pygame.draw.rect(surface, (150,0,0), (bx,by,bar_w,bar_h))
         pygame.draw.rect(surface, (0,255,0), (bx,by,int(bar_w*health_ratio),bar_h))
+        return dirty.union(bar)
 
     def take_damage(self, amount):
         self.health -= amount
@@ -108,6 +126,16 @@ class Enemy:
     def is_alive(self):
         return self.alive
 
+_fallback = None
+
+def _fallback_image():
+    """Red circle drawn when an enemy kind has no sprite frames."""
+    global _fallback
+    if _fallback is None:
+        _fallback = pygame.Surface((20,20), pygame.SRCALPHA)
+        pygame.draw.circle(_fallback, (255,0,0), (10,10), 10)
+    return _fallback
+
 def load_frames(folder, size):
     """Helper: load all PNGs from folder, scale to size×size."""
     files = sorted(glob.glob(os.path.join(folder, "*.png")))
@@ -117,101 +145,144 @@ def load_frames(folder, size):
         frames.append(pygame.transform.scale(img, (size, size)))
     return frames
 
+class FrameCache:
+    """Process-wide cache of decoded animation frames.
+
+    Entries are keyed by (folder, size, direction) and every enemy of a
+    kind shares the same Surface list, so a spawn never touches the disk.
+    The cache is bounded by `max_bytes`; least-recently-used entries are
+    evicted first, except for the roster pinned by `warm_up`.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes  = max_bytes
+        self.bytes_used = 0
+        self.hits       = 0
+        self.misses     = 0
+        self._entries   = OrderedDict()   # key -> (frames, nbytes)
+        self._pinned    = set()
+
+    def get(self, folder, size, direction):
+        key = (folder, size, direction)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        with tracing.span("load_frames", "assets", folder=folder, size=size,
+                          direction=direction):
+            return self._load(key, folder, size, direction)
+
+    def _load(self, key, folder, size, direction):
+        # A packed atlas holds both directions in one image read
+        sheet = load_atlas(os.path.basename(folder), size)
+        if sheet is not None:
+            for seq, frames in sheet.items():
+                self._store((folder, size, seq), frames)
+            return sheet.get(direction, [])
+
+        frames = load_frames(os.path.join(folder, direction), size)
+        if not frames and direction == "left":
+            # auto‐flip right into left
+            right = self.get(folder, size, "right")
+            frames = [pygame.transform.flip(f, True, False) for f in right]
+        self._store(key, frames)
+        return frames
+
+    def warm_up(self, enemy_types):
+        """Decode every animation of `enemy_types` now and pin them.
+
+        Entries belonging to a previous roster are released, so switching
+        levels only keeps the current roster resident.
+        """
+        keys = set()
+        for cls in enemy_types:
+            for direction in ("right", "left"):
+                keys.add((cls.sprite_folder, cls.sprite_size, direction))
+        self._pinned = keys
+        for key in list(self._entries):
+            if key not in keys:
+                self._drop(key)
+        for folder, size, direction in sorted(keys):
+            self.get(folder, size, direction)
+
+    def clear(self):
+        self._entries.clear()
+        self._pinned = set()
+        self.bytes_used = 0
+
+    def _store(self, key, frames):
+        if key in self._entries:
+            self._drop(key)
+        nbytes = sum(f.get_width() * f.get_height() * f.get_bytesize()
+                     for f in frames)
+        self._entries[key] = (frames, nbytes)
+        self.bytes_used += nbytes
+        self._evict()
+
+    def _drop(self, key):
+        _, nbytes = self._entries.pop(key)
+        self.bytes_used -= nbytes
+
+    def _evict(self):
+        for key in list(self._entries):
+            if self.bytes_used <= self.max_bytes:
+                break
+            if key not in self._pinned:
+                self._drop(key)
+
+frame_cache = FrameCache()
+
 def load_bidirectional_frames(base_folder, size):
     """Load right and left. If left folder empty, flip right."""
-    right = load_frames(os.path.join(base_folder, "right"), size)
-    left  = load_frames(os.path.join(base_folder, "left"), size)
-    if not left:
-        # auto‐flip right into left
-        left = [pygame.transform.flip(f, True, False) for f in right]
+    right = frame_cache.get(base_folder, size, "right")
+    left  = frame_cache.get(base_folder, size, "left")
     return right, left
 
+def preload_enemy_frames(enemy_types):
+    """Warm the shared frame cache for a level roster."""
+    frame_cache.warm_up(enemy_types)
+
 # ─── Subclasses ──────────────────────────────────────────────
 
 class Goblin(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        folder = os.path.join("assets","enemy","skel")
-        r, l = load_bidirectional_frames(folder, 150)
-        self.frames_right = r
-        self.frames_left  = l
-        self.frames       = self.frames_right
-        self.health       = 50;  self.max_health = 50
-        self.speed        = 2.0; self.original_speed = self.speed
+    sprite_folder = os.path.join("assets","enemy","skel")
+    max_health    = 50
+    base_speed    = 2.0
 
 class Orc(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        folder = os.path.join("assets","enemy","orc")
-        r, l = load_bidirectional_frames(folder, 150)
-        self.frames_right = r
-        self.frames_left  = l
-        self.frames       = self.frames_right
-        self.health       = 150; self.max_health = 150
-        self.speed        = 0.8; self.original_speed = self.speed
+    sprite_folder = os.path.join("assets","enemy","orc")
+    max_health    = 150
+    base_speed    = 0.8
 
 class Troll(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        folder = os.path.join("assets","enemy","troll")
-        r, l = load_bidirectional_frames(folder, 150)
-        self.frames_right = r
-        self.frames_left  = l
-        self.frames       = self.frames_right
-        self.health       = 250; self.max_health = 250
-        self.speed        = 0.5; self.original_speed = self.speed
+    sprite_folder = os.path.join("assets","enemy","troll")
+    max_health    = 250
+    base_speed    = 0.5
 
 class Boss(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        folder = os.path.join("assets","enemy","boss")
-        r, l = load_bidirectional_frames(folder, 150)
-        self.frames_right = r
-        self.frames_left  = l
-        self.frames       = self.frames_right
-        self.health       = 1000; self.max_health = 1000
-        self.speed        = 0.7;   self.original_speed = self.speed
+    sprite_folder = os.path.join("assets","enemy","boss")
+    max_health    = 1000
+    base_speed    = 0.7
 
 class Slime(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        folder = os.path.join("assets","enemy","slime")
-        r, l = load_bidirectional_frames(folder, 150)
-        self.frames_right = r
-        self.frames_left  = l
-        self.frames       = self.frames_right
-        self.health       = 200; self.max_health = 200
-        self.speed        = 1.5; self.original_speed = self.speed
+    sprite_folder = os.path.join("assets","enemy","slime")
+    max_health    = 200
+    base_speed    = 1.5
 
 class Werewolf(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        folder = os.path.join("assets","enemy","werewolf")
-        r, l = load_bidirectional_frames(folder, 150)
-        self.frames_right = r
-        self.frames_left  = l
-        self.frames       = self.frames_right
-        self.health       = 300; self.max_health = 300
-        self.speed        = 1.8; self.original_speed = self.speed
+    sprite_folder = os.path.join("assets","enemy","werewolf")
+    max_health    = 300
+    base_speed    = 1.8
 
 class Werebear(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        folder = os.path.join("assets","enemy","werebear")
-        r, l = load_bidirectional_frames(folder, 150)
-        self.frames_right = r
-        self.frames_left  = l
-        self.frames       = self.frames_right
-        self.health       = 500; self.max_health = 500
-        self.speed        = 0.6; self.original_speed = self.speed
+    sprite_folder = os.path.join("assets","enemy","werebear")
+    max_health    = 500
+    base_speed    = 0.6
 
 class OrcRider(Enemy):
-    def __init__(self, path):
-        super().__init__(path)
-        folder = os.path.join("assets","enemy","orcrider")
-        r, l = load_bidirectional_frames(folder, 150)
-        self.frames_right = r
-        self.frames_left  = l
-        self.frames       = self.frames_right
-        self.health       = 400; self.max_health = 400
-        self.speed        = 1.2; self.original_speed = self.speed
+    sprite_folder = os.path.join("assets","enemy","orcrider")
+    max_health    = 400
+    base_speed    = 1.2
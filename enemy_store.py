@@ -0,0 +1,224 @@
+from itertools import compress
+
+try:
+    import numpy as np
+except ImportError:  # optional: only needed for the stress-map mode
+    np = None
+
+from enemy import Enemy, load_bidirectional_frames
+from route import Route
+
+
+class EnemyStore:
+    """Structure-of-arrays enemy storage for very large waves.
+
+    Position, distance along the path, speed, slow expiry and health of
+    every live enemy sit in contiguous NumPy arrays. `step` advances all
+    of them in one vectorized pass along the shared path and compacts
+    dead and leaked entries in bulk. Game code talks to `EnemyView`
+    objects, which read and write the arrays through a stable id.
+    """
+
+    _FIELDS = ("x", "y", "prev_x", "prev_y", "dist", "speed", "base_speed",
+               "slow_until", "health", "seg", "ids")
+
+    def __init__(self, route, capacity=256):
+        if np is None:
+            raise ImportError("EnemyStore requires numpy (pip install numpy)")
+        route = route if isinstance(route, Route) else Route(route)
+
+        # Route geometry, shared by every enemy
+        pts = np.asarray(route.points, dtype=np.float64)
+        self._px, self._py = pts[:, 0], pts[:, 1]
+        self._cum    = np.asarray(route.cum, dtype=np.float64)
+        # x direction per waypoint index, for picking left/right frames
+        self._seg_dx = np.array([route.direction(i)[0] for i in range(len(route))])
+        self.length  = route.length
+        self.route   = route
+
+        self.count = 0
+        self.now   = 0
+        self.views = []
+        self._next_id = 0
+        self._slot_of = np.full(capacity, -1, dtype=np.int64)
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.capacity = capacity
+        for name in self._FIELDS:
+            dtype = np.int64 if name in ("seg", "ids") else np.float64
+            old = getattr(self, name, None)
+            arr = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                arr[:self.count] = old[:self.count]
+            setattr(self, name, arr)
+
+    # ─── Spawning ────────────────────────────────────────────
+
+    def spawn(self, cls):
+        if self.count == self.capacity:
+            self._alloc(self.capacity * 2)
+        if self._next_id == len(self._slot_of):
+            self._slot_of = np.concatenate(
+                (self._slot_of, np.full(len(self._slot_of), -1, dtype=np.int64)))
+
+        i, eid = self.count, self._next_id
+        self.x[i] = self.prev_x[i] = self._px[0]
+        self.y[i] = self.prev_y[i] = self._py[0]
+        self.dist[i]       = 0.0
+        self.speed[i]      = self.base_speed[i] = cls.base_speed
+        self.slow_until[i] = 0
+        self.health[i]     = cls.max_health
+        self.seg[i]        = 0
+        self.ids[i]        = eid
+        self._slot_of[eid] = i
+        self.count    += 1
+        self._next_id += 1
+
+        view = EnemyView(self, eid, cls)
+        self.views.append(view)
+        return view
+
+    # ─── Stepping ────────────────────────────────────────────
+
+    def step(self, now, step_scale=1.0):
+        """Move every enemy one tick; returns (killed, leaked) views."""
+        n = self.count
+        self.now = now
+        if not n:
+            return [], []
+
+        x, y = self.x[:n], self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+
+        # revert expired slows, then advance along the path
+        speed = self.speed[:n]
+        np.copyto(speed, self.base_speed[:n], where=now > self.slow_until[:n])
+        dist = self.dist[:n]
+        dist += speed * step_scale
+
+        d = np.minimum(dist, self.length)
+        x[:] = np.interp(d, self._cum, self._px)
+        y[:] = np.interp(d, self._cum, self._py)
+        seg = np.searchsorted(self._cum, d, side="right") - 1
+        np.clip(seg, 0, len(self._cum) - 1, out=self.seg[:n])
+
+        dead   = self.health[:n] <= 0
+        leaked = ~dead & (dist >= self.length)
+        remove = dead | leaked
+        if not remove.any():
+            return [], []
+
+        killed_views = [self.views[i] for i in np.flatnonzero(dead)]
+        leaked_views = [self.views[i] for i in np.flatnonzero(leaked)]
+        for v in killed_views + leaked_views:
+            v._detach()
+        self._compact(~remove)
+        return killed_views, leaked_views
+
+    def best_in_range(self, x, y, radius):
+        """Live enemy furthest along the path within `radius` of (x, y)."""
+        n = self.count
+        dx = self.x[:n] - x
+        dy = self.y[:n] - y
+        mask = (dx*dx + dy*dy <= radius*radius) & (self.health[:n] > 0)
+        if not mask.any():
+            return None
+        idx = np.flatnonzero(mask)
+        return self.views[idx[np.argmax(self.dist[:n][idx])]]
+
+    def _compact(self, keep):
+        idx = np.flatnonzero(keep)
+        m = len(idx)
+        for name in self._FIELDS:
+            arr = getattr(self, name)
+            arr[:m] = arr[idx]
+        self._slot_of[self.ids[:m]] = np.arange(m)
+        self.views[:] = compress(self.views, keep)
+        self.count = m
+
+
+class EnemyView:
+    """Thin Enemy-compatible handle onto one EnemyStore slot."""
+
+    frame_interval = 100
+    draw = Enemy.draw
+
+    def __init__(self, store, eid, cls):
+        self.store = store
+        self.id    = eid
+        self.kind  = cls
+        self.max_health = cls.max_health
+        self.route = store.route
+        self._snapshot = None   # (x, y, seg, health, dist) frozen when removed
+
+    def _slot(self):
+        return self.store._slot_of[self.id]
+
+    def _detach(self):
+        s = self._slot()
+        st = self.store
+        self._snapshot = (float(st.x[s]), float(st.y[s]), int(st.seg[s]),
+                          float(st.health[s]), float(st.dist[s]))
+        st._slot_of[self.id] = -1
+
+    def _read(self, field, snap_index):
+        if self._snapshot is not None:
+            return self._snapshot[snap_index]
+        return getattr(self.store, field)[self._slot()].item()
+
+    x             = property(lambda self: self._read("x", 0))
+    y             = property(lambda self: self._read("y", 1))
+    prev_x        = property(lambda self: self._read("prev_x", 0))
+    prev_y        = property(lambda self: self._read("prev_y", 1))
+    current_point = property(lambda self: self._read("seg", 2))
+    health        = property(lambda self: self._read("health", 3))
+    distance      = property(lambda self: self._read("dist", 4))
+
+    @property
+    def speed(self):
+        return 0.0 if self._snapshot is not None else self.store.speed[self._slot()].item()
+
+    def time_to_goal(self, step_scale=1.0):
+        # a detached view has no speed (see `speed`): never arrives
+        return self.route.time_to_goal(self.distance, self.speed * step_scale)
+
+    @property
+    def alive(self):
+        return self._snapshot is None and self.store.health[self._slot()] > 0
+
+    def is_alive(self):
+        return self.alive
+
+    def take_damage(self, amount):
+        if self._snapshot is None:
+            self.store.health[self._slot()] -= amount
+
+    def rescale(self, health_scale, speed_scale):
+        """Apply balance multipliers right after spawning."""
+        s = self._slot()
+        self.max_health = int(self.max_health * health_scale)
+        self.store.health[s] = self.max_health
+        self.store.base_speed[s] *= speed_scale
+        self.store.speed[s] = self.store.base_speed[s]
+
+    def apply_slow(self, multiplier, duration_ms, current_time):
+        if self._snapshot is None:
+            s = self._slot()
+            self.store.speed[s]      = self.store.base_speed[s] * multiplier
+            self.store.slow_until[s] = current_time + duration_ms
+
+    # Drawing state, derived from the store instead of kept per enemy
+    @property
+    def frame_index(self):
+        return int(self.store.now // self.frame_interval) + self.id
+
+    @property
+    def frames(self):
+        if self.kind.sprite_folder is None:
+            return []
+        right, left = load_bidirectional_frames(self.kind.sprite_folder,
+                                                self.kind.sprite_size)
+        seg = self.current_point
+        return left if self.store._seg_dx[seg] < 0 else right
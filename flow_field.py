@@ -0,0 +1,151 @@
+"""Goal-distance flow field over a walkable tile grid.
+
+One multi-source BFS from every goal tile gives each walkable tile its
+step distance to the nearest exit. Any enemy, from any spawn or from
+wherever it stands, then finds its next tile in O(1) by stepping to the
+neighbour one closer. When a tile is blocked or opened only the region
+whose distances actually change is recomputed.
+"""
+import heapq
+from collections import deque
+
+INF = 1 << 30
+
+# same neighbour order as Map._astar, so ties break the same way
+DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+class FlowField:
+    def __init__(self, grid, goals, dist=None):
+        self.height = len(grid)
+        self.width  = len(grid[0]) if grid else 0
+        self.walkable = bytearray(1 if cell else 0 for row in grid for cell in row)
+        self.goals = [tuple(g) for g in goals]
+        self._goal_idx = {r * self.width + c for r, c in self.goals}
+        if dist is not None:
+            self.dist = list(dist)
+        else:
+            self.dist = [INF] * (self.width * self.height)
+            self._bfs()
+
+    # ─── Queries ─────────────────────────────────────────────
+
+    def distance(self, r, c):
+        """Steps from (r, c) to the nearest goal, INF if cut off."""
+        return self.dist[r * self.width + c]
+
+    def _neighbours(self, i):
+        w = self.width
+        r, c = divmod(i, w)
+        for dr, dc in DIRS:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < self.height and 0 <= nc < w:
+                yield nr * w + nc
+
+    def next_tile(self, r, c):
+        """The neighbour one step closer to a goal, or None at a goal or
+        on a tile with no way out."""
+        i = r * self.width + c
+        d = self.dist[i]
+        if d == 0 or d >= INF:
+            return None
+        for j in self._neighbours(i):
+            if self.dist[j] == d - 1:
+                return divmod(j, self.width)
+        return None
+
+    def trace(self, start):
+        """Tile path from `start` down the field to a goal; [] if the
+        start cannot reach one."""
+        if self.distance(*start) >= INF:
+            return []
+        path = [tuple(start)]
+        while True:
+            nxt = self.next_tile(*path[-1])
+            if nxt is None:
+                return path
+            path.append(nxt)
+
+    # ─── Building and updates ────────────────────────────────
+
+    def _bfs(self):
+        dist, walk = self.dist, self.walkable
+        queue = deque()
+        for i in self._goal_idx:
+            if walk[i]:
+                dist[i] = 0
+                queue.append(i)
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            for j in self._neighbours(i):
+                if walk[j] and dist[j] > d:
+                    dist[j] = d
+                    queue.append(j)
+
+    def set_walkable(self, r, c, walkable):
+        """Open or block one tile; returns the tiles whose distance
+        changed, as flat indices."""
+        i = r * self.width + c
+        if bool(self.walkable[i]) == bool(walkable):
+            return []
+        self.walkable[i] = 1 if walkable else 0
+        return self._lower(i) if walkable else self._raise(i)
+
+    def _lower(self, i):
+        # opening a tile can only shorten distances: relax outwards
+        dist, walk = self.dist, self.walkable
+        best = 0 if i in self._goal_idx else min(
+            (dist[j] for j in self._neighbours(i) if walk[j]), default=INF) + 1
+        if best >= INF:
+            return []
+        dist[i] = best
+        changed, queue = [i], deque([i])
+        while queue:
+            u = queue.popleft()
+            d = dist[u] + 1
+            for j in self._neighbours(u):
+                if walk[j] and dist[j] > d:
+                    dist[j] = d
+                    changed.append(j)
+                    queue.append(j)
+        return changed
+
+    def _raise(self, i):
+        # blocking a tile can only lengthen distances, and only for tiles
+        # whose every shortest way out ran through it
+        dist, walk = self.dist, self.walkable
+        if dist[i] >= INF:
+            return []
+        affected, queue = {i}, deque([i])
+        while queue:
+            u = queue.popleft()
+            for v in self._neighbours(u):
+                if v in affected or not walk[v] or dist[v] != dist[u] + 1:
+                    continue
+                if not any(walk[w] and w not in affected and dist[w] == dist[v] - 1
+                           for w in self._neighbours(v)):
+                    affected.add(v)
+                    queue.append(v)
+
+        for v in affected:
+            dist[v] = INF
+        # re-seed the region from its unaffected border, then settle it
+        heap = []
+        for v in affected:
+            if not walk[v]:
+                continue
+            d = min((dist[w] for w in self._neighbours(v) if walk[w]), default=INF)
+            if d < INF:
+                dist[v] = d + 1
+                heap.append((d + 1, v))
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v in self._neighbours(u):
+                if v in affected and walk[v] and dist[v] > d + 1:
+                    dist[v] = d + 1
+                    heapq.heappush(heap, (d + 1, v))
+        return list(affected)
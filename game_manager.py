@@ -1,274 +1,277 @@
-import pygame, sys, csv, os
-from enemy import Goblin, Orc, Troll, Boss
-from tower import ArcherTower, CannonTower, MagicTower, IceTower
-from projectile import Projectile
+import pygame
+from simulation import Simulation
+from maze import Maze
+from text_cache import get_font, text_cache
+from overlay import ModalLayer
+from stats_sink import shared_sink
+from profiler import FrameProfiler
+import tracing
+
+TOWER_ICONS = {
+    "archer": "assets/icon/archer_icon.png",
+    "cannon": "assets/icon/cannon_icon.png",
+    "magic":  "assets/icon/magic_icon.png",
+    "ice":    "assets/icon/ice_icon.png",
+}
+# scaled icons, decoded once per process
+_icon_cache = {}
 
 class GameManager:
+    """Renderer and input layer on top of a headless `Simulation`."""
+
     def __init__(self, screen, map_obj, menu,
                  base_enemy_types=None,
-                 boss_class=None):
-        pygame.font.init()
+                 boss_class=None,
+                 renderer=None,
+                 stats_sink=None,
+                 telemetry=None,
+                 mazing=False,
+                 profile=False):
         self.screen = screen
         self.map    = map_obj
         self.menu   = menu
-        # Use Arial so we can render “≡”
-        self.font   = pygame.font.SysFont("Arial", 36)
-
-        # Enemy roster
-        self.base_enemy_types = base_enemy_types or [Goblin, Orc, Troll]
-        self.boss_class       = boss_class or Boss
-        self.enemy_types      = list(self.base_enemy_types)
-
-        # Game state
-        self.enemies     = []
-        self.projectiles = []
-        self.towers      = []
-
-        self.player_money = 100
-        self.health       = 10
-
-        # Wave control
-        self.wave             = 14
-        self.wave_in_progress = False
-        self.victory          = False
-        self.paused           = False
-        self.game_over        = False
-
-        # Spawning
-        self.spawn_timer      = 0
-        self.spawn_interval   = 800
-        self.enemies_to_spawn = 0
-        self.spawned_count    = 0
-        self.is_boss_wave     = False
-
-        # Manual start trigger
-        self.manual_wave_trigger = False
-
-        # Speed toggle
-        self.time_multiplier = 1
+        # Optional DirtyRectRenderer; None means the caller flips fully
+        self.renderer = renderer
+        # Use Arial so we can render “≡”; fonts are opened once per process
+        self.font         = get_font("Arial", 36)
+        self.stats_font   = get_font(None, 20)
+        self.summary_font = get_font(None, 24)
+        self.profiler_font = get_font("monospace", 15)
+
+        # Mazing: towers may also go on the path and re-route it
+        self.maze = Maze(map_obj) if mazing else None
+        self.base_enemy_types = base_enemy_types
+        self.boss_class       = boss_class
 
         # Tower slots
-        self.available_slots    = map_obj.get_tower_points()
-        self.occupied_slots     = {}
-        self.selected_slot      = None
-        self.selected_tower     = None
-        self.showing_tower_menu = False
-        self.tower_icons        = {}
-        self.tower_icon_rects   = []
+        self.available_slots = map_obj.get_tower_points()
+        self.tower_icons     = {}
 
         # UI buttons
         w, h = self.screen.get_size()
         self.wave_button_rect  = pygame.Rect(w-150,  80, 130, 40)
         self.speed_button_rect = pygame.Rect(w-150, 130, 130, 40)
         self.menu_button_rect  = pygame.Rect(w- 50,  10,  40, 40)
+        self.summary_button_rect = pygame.Rect(w//2 - 60, h//2 + 100, 120, 40)
+
+        # Pause and summary screens are composed once, then blitted whole
+        self._pause_layer   = ModalLayer(self._build_pause)
+        self._summary_layer = ModalLayer(self._build_summary)
+
+        self.load_tower_icons()
+
+        # Wave stats are appended to rolling CSV segments off-thread
+        self.stats_sink = stats_sink or shared_sink()
+        # Optional SQLiteStatsSink keeping every session, keyed by level
+        self.telemetry = telemetry
+
+        # FrameProfiler while the F3 overlay is on or a trace is being
+        # recorded (tracing.py), else None
+        self.profiler      = None
+        self.show_profiler = profile
+        self.sim = None
+        self.reset()
+        self._sync_profiler()
+
+    def reset(self):
+        """Start the level over in place: a fresh simulation and UI
+        state on the same window, map, fonts, icons and sinks."""
+        self._clear_maze()
+
+        # All game rules live in the simulation
+        self.sim = Simulation(
+            self.map.route,
+            self.map.get_tower_points(),
+            base_enemy_types=self.base_enemy_types,
+            boss_class=self.boss_class,
+            routes=self.map.routes,
+            maze=self.maze
+        )
+        self.sim.profiler     = self.profiler
+        self.base_enemy_types = self.sim.base_enemy_types
+        self.boss_class       = self.sim.boss_class
+        self.tower_costs      = self.sim.tower_costs
+
+        # Front-end state
+        self.paused = False
+        self._last_tick = pygame.time.get_ticks()
+
+        self.selected_slot      = None
+        self.selected_tower     = None
+        self.showing_tower_menu = False
+        self.tower_icon_rects   = []
+        self.checked_slot       = None   # maze tile can_block approved
 
         # Victory/session stats
-        self.session_wave_stats = []
-        self._summary_shown     = False
+        self._summary_shown = False
+        self._summary_layer.invalidate()
+        self._modal_shown   = False
 
         # Show/hide start button
         self.show_wave_button = True
 
-        self.load_tower_icons()
-
-        # CSV for stats
-        self.stats_path = "game_stats.csv"
-        if not os.path.exists(self.stats_path):
-            with open(self.stats_path, "w", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "Wave",
-                    "Enemies Defeated",
-                    "Towers Placed",
-                    "Placement Effectiveness",
-                    "Damage Dealt",
-                    "Wave Time (ms)",
-                    "Currency Spent"
-                ])
-
-        self._reset_wave_stats()
-
-    def _reset_wave_stats(self):
-        self.enemies_defeated = 0
-        self.towers_placed    = 0
-        self.total_damage     = 0
-        self.currency_spent   = 0
-        self._wave_start_time = pygame.time.get_ticks()
+        if self.renderer is not None:
+            self.renderer.set_background(self.map.get_background())
+        if self.telemetry is not None:
+            self.telemetry.begin_session(self.menu.selected_level,
+                                         [cls.__name__ for cls in self.sim.enemy_types])
+
+    def toggle_profiler(self):
+        """Show or hide the phase timing overlay (F3)."""
+        self.show_profiler = not self.show_profiler
+        self._mark_full()   # draw or wipe the panel
+        self._sync_profiler()
+
+    def _sync_profiler(self, keep=True):
+        # phases are timed only while the overlay or a trace needs them
+        want = keep and (self.show_profiler or tracing.active is not None)
+        if want and self.profiler is None:
+            self.profiler = FrameProfiler()
+        elif not want and self.profiler is not None:
+            self.profiler.close()
+            self.profiler = None
+        if self.profiler is not None:
+            self.profiler.tracer = tracing.active
+        self.sim.profiler = self.profiler
+
+    def handle_key(self, key):
+        if key == pygame.K_F3:
+            self.toggle_profiler()
+        elif key == pygame.K_F9 and tracing.active is not None:
+            tracing.active.dump(background=True)
+
+    def _clear_maze(self):
+        # towers built on the path leave the (shared) map's grid as found
+        if self.sim is not None and self.maze is not None:
+            for tile in self.sim.blocked_tiles.values():
+                self.maze.unblock(*tile)
+            self.sim.blocked_tiles.clear()
 
     def load_tower_icons(self):
-        icons = {
-            "archer": "assets/icon/archer_icon.png",
-            "cannon": "assets/icon/cannon_icon.png",
-            "magic":  "assets/icon/magic_icon.png",
-            "ice":    "assets/icon/ice_icon.png",
-        }
-        self.tower_costs = {
-            "archer": 30,
-            "cannon": 50,
-            "magic":  40,
-            "ice":    20,
-        }
-        for kind, path in icons.items():
-            img = pygame.image.load(path)
-            self.tower_icons[kind] = pygame.transform.scale(img, (40, 40))
-
-    def start_new_wave(self):
-        self.spawned_count = 0
-        self._reset_wave_stats()
-        self.show_wave_button = False
-
-        # Boss waves?
-        if self.wave in (5, 10, 15):
-            self.is_boss_wave     = True
-            self.enemy_types      = [self.boss_class] + list(self.base_enemy_types)
-            self.enemies_to_spawn = 1 + (5 + self.wave * 2)
-        else:
-            self.is_boss_wave     = False
-            self.enemy_types      = list(self.base_enemy_types)
-            self.enemies_to_spawn = 5 + self.wave * 2
-
-        self.wave_in_progress   = True
-        self.manual_wave_trigger = False
+        for kind, path in TOWER_ICONS.items():
+            icon = _icon_cache.get(path)
+            if icon is None:
+                icon = _icon_cache[path] = pygame.transform.scale(pygame.image.load(path), (40, 40))
+            self.tower_icons[kind] = icon
 
     def update(self):
         now = pygame.time.get_ticks()
+        dt, self._last_tick = now - self._last_tick, now
+        sim = self.sim
 
+        self._modal_shown = self._modal_up()
         if self.paused:
             self._draw_pause_overlay()
             return
-        if self.victory:
+        if sim.victory:
             self._draw_victory()
             return
-        if self.game_over:
+        if sim.game_over:
             self._draw_game_over()
             return
 
-        # Handle manual start
-        if not self.wave_in_progress and self.manual_wave_trigger:
-            self.wave += 1
-            if self.wave > 15:
-                lvl = self.menu.selected_level
-                # mark current level complete
-                self.menu.level_progress[lvl]["completed"] = True
-                # unlock next level
-                next_level = f"level{int(lvl[-1]) + 1}"
-                if next_level in self.menu.level_progress:
-                    self.menu.level_progress[next_level]["completed"] = True
-                self.menu.save_progress()
-                self.victory = True
-            else:
-                self.start_new_wave()
-
-        # Spawn enemies
-        if self.wave_in_progress and self.spawned_count < self.enemies_to_spawn:
-            if now - self.spawn_timer >= self.spawn_interval // self.time_multiplier:
-                cls = (self.boss_class if self.is_boss_wave and self.spawned_count == 0
-                       else self.enemy_types[self.spawned_count % len(self.enemy_types)])
-                self.enemies.append(cls(self.map.path))
-                self.spawned_count += 1
-                self.spawn_timer = now
-
-        # Update enemies
-        for e in self.enemies[:]:
-            e.move(self.time_multiplier)
-            e.draw(self.screen)
-            if not e.alive:
-                self.enemies.remove(e)
-                self.enemies_defeated += 1
-                self.player_money   += 10
-            elif e.current_point >= len(e.path) - 1:
-                self.health -= 1
-                self.enemies.remove(e)
-                if self.health <= 0:
-                    self.game_over = True
-                    break
-
-        # Update projectiles
-        for p in self.projectiles[:]:
-            p.update()
-            p.draw(self.screen)
-            if not p.alive:
-                self.total_damage += getattr(p, "damage", 0)
-                self.projectiles.remove(p)
-
-        # Update towers
-        for t in self.towers:
-            t.shoot(self.enemies, now, self.projectiles, self.time_multiplier)
-            t.draw(self.screen)
+        prof = self.profiler
+        sim.step(dt)
+        if self.maze is not None:
+            self.maze.update()
+            if prof:
+                prof.lap("maze")
+        for name, payload in sim.drain_events():
+            self._handle_sim_event(name, payload)
+        if prof:
+            prof.lap("sim events")
+
+        # Draw world, interpolated between the last two ticks
+        alpha = sim.clock.alpha
+        for e in sim.enemies:
+            self._mark(e.draw(self.screen, alpha))
+        for p in sim.projectiles:
+            self._mark(p.draw(self.screen, alpha))
+        for t in sim.towers:
+            self._mark(t.draw(self.screen))
+        if prof:
+            prof.lap("draw world")
 
         # UI & selection
         self._draw_ui()
         self.draw_tower_selection()
-
-        # Wave cleared?
-        if (self.wave_in_progress
-            and self.spawned_count == self.enemies_to_spawn
-            and not self.enemies):
-            wave_time = now - self._wave_start_time
-            self.session_wave_stats.append({
-                "wave": self.wave,
-                "enemies": self.enemies_defeated,
-                "damage": self.total_damage,
-                "time_ms": wave_time,
-                "currency_spent": self.currency_spent
-            })
-
-            # Trim & append CSV
-            with open(self.stats_path, "r") as f:
-                lines = f.readlines()
-            header, data = lines[0], lines[1:]
-            if len(data) >= 50:
-                data = data[1:]
-            with open(self.stats_path, "w") as f:
-                f.writelines([header] + data)
-            with open(self.stats_path, "a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    self.wave,
-                    self.enemies_defeated,
-                    self.towers_placed,
-                    round(self.enemies_defeated / max(1, self.towers_placed), 2),
-                    self.total_damage,
-                    wave_time,
-                    self.currency_spent
-                ])
-
-            self._reset_wave_stats()
-            self.wave_in_progress = False
+        if prof:
+            prof.lap("draw ui")
+            if self.show_profiler:
+                self._mark(prof.draw(self.screen, self.profiler_font))
+                prof.lap("profiler")
+
+    def _modal_up(self):
+        return self.paused or self.sim.victory or self.sim.game_over
+
+    @property
+    def idle(self):
+        """True while a pause or summary screen is already on screen:
+        nothing moves behind it, so the frame need not be redrawn."""
+        return self._modal_shown and self._modal_up()
+
+    def _handle_sim_event(self, name, payload):
+        if name == "wave_started":
+            self.show_wave_button = False
+        elif name == "wave_cleared":
+            self._record_wave_stats(payload)
             self.show_wave_button = True
+        elif name == "routes_changed":
+            # the baked background shows the path
+            if self.renderer is not None:
+                self.renderer.set_background(self.map.get_background())
+        elif name.startswith("tower_"):
+            if self.telemetry is not None:
+                self.telemetry.record_tower(name[len("tower_"):], payload)
+        elif name == "game_over":
+            self._end_session("defeat")
+        elif name == "victory":
+            self._end_session("victory")
+            lvl = self.menu.selected_level
+            # mark current level complete
+            self.menu.level_progress[lvl]["completed"] = True
+            # unlock next level
+            next_level = f"level{int(lvl[-1]) + 1}"
+            if next_level in self.menu.level_progress:
+                self.menu.level_progress[next_level]["completed"] = True
+            self.menu.save_progress()
+
+    def _record_wave_stats(self, stats):
+        self.stats_sink.write(stats)
+        if self.telemetry is not None:
+            self.telemetry.write(stats)
+
+    def _end_session(self, outcome):
+        if self.telemetry is not None:
+            self.telemetry.end_session(outcome)
+
+    # ——— Input ———
 
     def handle_click(self, pos):
-        if self.wave_button_rect.collidepoint(pos) and not self.wave_in_progress:
-            self.manual_wave_trigger = True
+        if self.paused:
+            self._handle_pause_click(pos)
             return
-        if self.speed_button_rect.collidepoint(pos):
-            self.time_multiplier = 2 if self.time_multiplier == 1 else 1
-            return
-        if self.menu_button_rect.collidepoint(pos):
-            self.paused = True
+        if self.sim.victory or self.sim.game_over:
+            if self.summary_button_rect.collidepoint(pos):
+                self._return_to_menu()
             return
 
-    def handle_click(self, pos):
-        if self.wave_button_rect.collidepoint(pos) and not self.wave_in_progress:
-            self.manual_wave_trigger = True; return
+        if self.wave_button_rect.collidepoint(pos) and not self.sim.wave_in_progress:
+            self.sim.request_wave(); return
         if self.speed_button_rect.collidepoint(pos):
-            self.time_multiplier = 2 if self.time_multiplier==1 else 1; return
+            self.sim.time_multiplier = 2 if self.sim.time_multiplier==1 else 1; return
         if self.menu_button_rect.collidepoint(pos):
             self.paused = True; return
 
         # Sell first
         if self.selected_tower and hasattr(self, "sell_button_rect") \
            and self.sell_button_rect.collidepoint(pos):
-            self._sell_tower(); 
+            self._sell_tower();
             return
 
         # Upgrade
         if self.selected_tower and self.upgrade_button_rect.collidepoint(pos):
-            cost = self.selected_tower.upgrade_cost
-            if self.player_money >= cost:
-                self.currency_spent += cost
-                self.player_money  -= cost
-                self.selected_tower.upgrade()
+            self.sim.upgrade_tower(self.selected_tower)
             return
 
         # tower placement menu...
@@ -276,72 +279,109 @@ class GameManager:
             for rect, kind in self.tower_icon_rects:
                 if rect.collidepoint(pos):
                     self._place_tower(kind); return
-            self.selected_slot = None; self.showing_tower_menu = False; return
+            self.selected_slot = None; self.showing_tower_menu = False
+            self.checked_slot = None; return
 
         # select/deselect slots & towers
-        for slot, tw in self.occupied_slots.items():
+        for slot, tw in self.sim.occupied_slots.items():
             dx, dy = pos[0]-slot[0], pos[1]-slot[1]
             if dx*dx+dy*dy <= 20*20:
                 self.selected_tower = tw; return
         for slot in self.available_slots:
-            if slot not in self.occupied_slots:
+            if slot not in self.sim.occupied_slots:
                 dx, dy = pos[0]-slot[0], pos[1]-slot[1]
                 if dx*dx+dy*dy <= 15*15:
                     self.selected_slot = slot; self.showing_tower_menu = True; return
+        if self.maze is not None:
+            r, c = self.maze.tile_at(*pos)
+            if self.maze.can_block(r, c, keep=self.sim.enemy_tiles()):
+                self.selected_slot = self.checked_slot = self.map._tile_to_pixel(r, c)
+                self.showing_tower_menu = True; return
         self.selected_tower = None
 
+    def _handle_pause_click(self, pos):
+        resume, restart, main_menu = (rect for rect, _ in self._pause_buttons())
+        if resume.collidepoint(pos):
+            self.paused = False
+        elif restart.collidepoint(pos):
+            # restart level in place
+            self._end_session("restart")
+            self.reset()
+        elif main_menu.collidepoint(pos):
+            # unwind to the menu's own loop rather than starting another
+            self._end_session("quit")
+            self._return_to_menu()
+
+    def _return_to_menu(self):
+        # 1) Reset summary tracking
+        self._summary_shown = False
+        self._summary_layer.invalidate()
+        self.sim.session_wave_stats.clear()
+        self._clear_maze()
+        self._sync_profiler(keep=False)
+        # 2) Destroy the current game window
+        pygame.display.quit()
+        # 3) Re-init video & open main menu
+        pygame.display.init()
+        self.menu.screen = pygame.display.set_mode((600, 400))
+        pygame.display.set_caption("Tower Defense – Main Menu")
+        # 4) Switch MainMenu state
+        self.menu.state = "main_menu"
+        self.menu.game_started = False
+
     def _place_tower(self, kind):
-        cost_map = {"archer":30,"cannon":50,"magic":40,"ice":20}
-        cost = cost_map[kind]
-        if self.player_money >= cost:
-            self.currency_spent += cost
-            self.towers_placed  += 1
-            cls = {"archer":ArcherTower,"cannon":CannonTower,
-                   "magic":MagicTower,"ice":IceTower}[kind]
-            tw = cls(*self.selected_slot)
-            self.towers.append(tw)
-            self.occupied_slots[self.selected_slot] = tw
-            self.player_money -= cost
-        self.selected_slot = None
+        # the connectivity check ran when the tile was picked: while the
+        # menu is up the grid can only gain open tiles (a sale), and an
+        # enemy never walks into a region the block would seal, only
+        # onto the tile itself, which block() still refuses
+        self.sim.place_tower(kind, self.selected_slot,
+                             checked=self.selected_slot == self.checked_slot)
+        self.selected_slot = self.checked_slot = None
         self.showing_tower_menu = False
 
     def _sell_tower(self):
-        tw = self.selected_tower
-        refund = tw.get_sell_value()
-        self.player_money += refund
-        for slot, tower in list(self.occupied_slots.items()):
-            if tower is tw:
-                del self.occupied_slots[slot]
-                break
-        self.towers.remove(tw)
+        self.sim.sell_tower(self.selected_tower)
         self.selected_tower = None
 
     # ——— UI Helpers ———
 
+    def _text(self, text, color, font=None):
+        """Rendered `text`, rasterized only when it changes."""
+        return text_cache.render(font or self.font, text, color)
+
+    def _mark(self, rect):
+        """Report a drawn screen rect to the dirty-rect renderer, if any."""
+        if self.renderer is not None:
+            self.renderer.mark(rect)
+
+    def _mark_full(self):
+        if self.renderer is not None:
+            self.renderer.invalidate()
+
     def _draw_ui(self):
+        mark = self._mark
+        sim  = self.sim
         # HUD
-        self.screen.blit(self.font.render(f"Money: {self.player_money}", True, (255, 255, 0)), (10, 10))
-        self.screen.blit(self.font.render(f"Wave: {self.wave}", True, (255, 255, 255)), (10, 40))
-        self.screen.blit(self.font.render(f"HP: {self.health}", True, (255, 100, 100)), (10, 70))
+        mark(self.screen.blit(self._text(f"Money: {sim.player_money}", (255, 255, 0)), (10, 10)))
+        mark(self.screen.blit(self._text(f"Wave: {sim.wave}", (255, 255, 255)), (10, 40)))
+        mark(self.screen.blit(self._text(f"HP: {sim.health}", (255, 100, 100)), (10, 70)))
 
         # Start Wave / Finish button
         if self.show_wave_button:
-            button_text = "Finish" if self.wave == 15 else "Start Wave"
-            pygame.draw.rect(self.screen, (70, 70, 70), self.wave_button_rect, border_radius=8)
-            lbl = self.font.render(button_text, True, (255, 255, 255))
-            self.screen.blit(lbl, lbl.get_rect(center=self.wave_button_rect.center))
+            button_text = "Finish" if sim.wave == sim.final_wave else "Start Wave"
+            mark(pygame.draw.rect(self.screen, (70, 70, 70), self.wave_button_rect, border_radius=8))
+            lbl = self._text(button_text, (255, 255, 255))
+            mark(self.screen.blit(lbl, lbl.get_rect(center=self.wave_button_rect.center)))
 
         # Speed button
-        pygame.draw.rect(self.screen, (50, 50, 50), self.speed_button_rect, border_radius=8)
-        sl = self.font.render(f"Speed x{self.time_multiplier}", True, (255, 255, 255))
-        self.screen.blit(sl, self.speed_button_rect.move(10, 5))
+        mark(pygame.draw.rect(self.screen, (50, 50, 50), self.speed_button_rect, border_radius=8))
+        sl = self._text(f"Speed x{sim.time_multiplier}", (255, 255, 255))
+        mark(self.screen.blit(sl, self.speed_button_rect.move(10, 5)))
 
         # Pause/Menu button
-        pygame.draw.rect(self.screen, (200, 200, 200), self.menu_button_rect)
-        mi = self.font.render("≡", True, (50, 50, 50))
-        self.screen.blit(mi, mi.get_rect(center=self.menu_button_rect.center))
-
-
+        mark(pygame.draw.rect(self.screen, (200, 200, 200), self.menu_button_rect))
+        mi = self._text("≡", (50, 50, 50))
+        mark(self.screen.blit(mi, mi.get_rect(center=self.menu_button_rect.center)))
 
     def draw_tower_selection(self):
         # Placement icons
@@ -354,16 +394,16 @@ class GameManager:
                 # Draw icon
                 ico = self.tower_icons[kind]
                 rect = ico.get_rect(topleft=(x + offs, y - 60 + i * sp))
-                self.screen.blit(ico, rect)
+                self._mark(self.screen.blit(ico, rect))
                 self.tower_icon_rects.append((rect, kind))
 
                 # Draw cost
                 cost = self.tower_costs[kind]
-                cost_text = self.font.render(f"${cost}", True, (255, 255, 255))
-                self.screen.blit(cost_text, (x + offs + 50, y - 55 + i * sp))
+                cost_text = self._text(f"${cost}", (255, 255, 255))
+                self._mark(self.screen.blit(cost_text, (x + offs + 50, y - 55 + i * sp)))
 
         # Upgrade panel
-        
+
         if self.selected_tower:
             x, y = self.selected_tower.x, self.selected_tower.y
             px, py = x + 50, y - 60
@@ -371,25 +411,24 @@ class GameManager:
             # If not maxed, draw Upgrade button
             if self.selected_tower.level < 5:
                 self.upgrade_button_rect = pygame.Rect(px, py, 100, 30)
-                pygame.draw.rect(self.screen, (90,90,90), self.upgrade_button_rect, border_radius=6)
-                u_lbl = self.font.render("Upgrade", True, (255,255,255))
-                self.screen.blit(u_lbl, u_lbl.get_rect(center=self.upgrade_button_rect.center))
+                self._mark(pygame.draw.rect(self.screen, (90,90,90), self.upgrade_button_rect, border_radius=6))
+                u_lbl = self._text("Upgrade", (255,255,255))
+                self._mark(self.screen.blit(u_lbl, u_lbl.get_rect(center=self.upgrade_button_rect.center)))
             else:
                 # draw a disabled “MAX” badge instead
                 max_rect = pygame.Rect(px, py, 100, 30)
-                pygame.draw.rect(self.screen, (50,50,50), max_rect, border_radius=6)
-                m_lbl = self.font.render("MAX", True, (200,200,200))
-                self.screen.blit(m_lbl, m_lbl.get_rect(center=max_rect.center))
+                self._mark(pygame.draw.rect(self.screen, (50,50,50), max_rect, border_radius=6))
+                m_lbl = self._text("MAX", (200,200,200))
+                self._mark(self.screen.blit(m_lbl, m_lbl.get_rect(center=max_rect.center)))
 
             # — Sell button (below upgrade) —
             sell_y = py + 40
             self.sell_button_rect = pygame.Rect(px, sell_y, 100, 30)
-            pygame.draw.rect(self.screen, (150,50,50), self.sell_button_rect, border_radius=6)
-            s_lbl = self.font.render("Sell", True, (255,255,255))
-            self.screen.blit(s_lbl, s_lbl.get_rect(center=self.sell_button_rect.center))
+            self._mark(pygame.draw.rect(self.screen, (150,50,50), self.sell_button_rect, border_radius=6))
+            s_lbl = self._text("Sell", (255,255,255))
+            self._mark(self.screen.blit(s_lbl, s_lbl.get_rect(center=self.sell_button_rect.center)))
 
             # — Stats panel (below sell) —
-            sf = pygame.font.Font(None, 20)
             stats = [
                 f"Lv: {self.selected_tower.level}",
                 f"Dmg: {self.selected_tower.damage}",
@@ -399,189 +438,62 @@ class GameManager:
                 f"Sell ${self.selected_tower.get_sell_value()}"
             ]
             for i, txt in enumerate(stats):
-                line = sf.render(txt, True, (200,200,200))
-                self.screen.blit(line, (px, sell_y + 40 + i*18))
-
-    def _place_tower(self, kind):
-        cost_map = {"archer":30, "cannon":50, "magic":40, "ice":20}
-        cost = cost_map[kind]
-        if self.player_money >= cost:
-            # 1) Track spending and placement
-            self.currency_spent  += cost
-            self.towers_placed   += 1
-
-            # 2) Deduct money and place tower
-            cls = {
-                "archer": ArcherTower,
-                "cannon": CannonTower,
-                "magic": MagicTower,
-                "ice": IceTower
-            }[kind]
-            tw = cls(*self.selected_slot)
-            self.towers.append(tw)
-            self.occupied_slots[self.selected_slot] = tw
-            self.player_money -= cost
-
-        self.selected_slot = None
-        self.showing_tower_menu = False
-
+                line = self._text(txt, (200,200,200), self.stats_font)
+                self._mark(self.screen.blit(line, (px, sell_y + 40 + i*18)))
 
-    def _draw_pause_overlay(self):
+    def _pause_buttons(self):
         w, h = self.screen.get_size()
-        overlay = pygame.Surface((w, h)); overlay.set_alpha(180); overlay.fill((0,0,0))
-        self.screen.blit(overlay, (0,0))
-
         btn_w, btn_h = 200, 50
         cx, cy = w//2, h//2
-        btns = [
+        return [
             (pygame.Rect(cx-btn_w//2, cy-80, btn_w, btn_h), "Resume"),
             (pygame.Rect(cx-btn_w//2, cy,    btn_w, btn_h), "Restart"),
             (pygame.Rect(cx-btn_w//2, cy+80, btn_w, btn_h), "Main Menu"),
         ]
-        for rect, label in btns:
-            pygame.draw.rect(self.screen, (70,70,70), rect, border_radius=8)
-            t = self.font.render(label, True, (255,255,255))
-            self.screen.blit(t, t.get_rect(center=rect.center))
-
-        for ev in pygame.event.get():
-            if ev.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if ev.type == pygame.MOUSEBUTTONDOWN:
-                mx, my = pygame.mouse.get_pos()
-                if btns[0][0].collidepoint((mx,my)):
-                    self.paused = False
-                elif btns[1][0].collidepoint((mx,my)):
-                    # restart level
-                    self.__init__(self.screen, self.map, self.menu)
-                elif btns[2][0].collidepoint((mx,my)):
-                    from main_menu import MainMenu
-                    pygame.display.set_mode((600,400))
-                    MainMenu().run()
 
-    def _draw_victory(self):
-        w, h = self.screen.get_size()
-
-        # Compute and cache the session summary (only once)
-        if not self._summary_shown:
-            stats = self.session_wave_stats
-            W = len(stats)
-            total_enemies = sum(s["enemies"] for s in stats)
-            total_damage  = sum(s["damage"]   for s in stats)
-            total_spent   = sum(s["currency_spent"] for s in stats)
-            avg_time      = (sum(s["time_ms"] for s in stats) // W) if W else 0
-
-            self._session_summary = {
-                "Waves":         W,
-                "Enemies":       total_enemies,
-                "Damage":        total_damage,
-                "Spent":         total_spent,
-                "Avg Time (ms)": avg_time
-            }
-            self._summary_shown = True
-
-        # Draw overlay
-        overlay = pygame.Surface((w, h))
-        overlay.set_alpha(180)
-        overlay.fill((0,0,0))
-        self.screen.blit(overlay, (0,0))
-
-        # Victory text
-        txt = self.font.render("VICTORY!", True, (0,255,0))
-        self.screen.blit(txt, txt.get_rect(center=(w//2, h//2 - 80)))
+    def _draw_pause_overlay(self):
+        self._mark_full()
+        self._pause_layer.draw(self.screen)
 
-        # Session summary
-        sf = pygame.font.Font(None, 24)
-        sx, sy = w//2 - 150, h//2 - 40
-        for i, (key, val) in enumerate(self._session_summary.items()):
-            line = sf.render(f"{key}: {val}", True, (255,255,255))
-            self.screen.blit(line, (sx, sy + i*30))
+    def _build_pause(self, surface):
+        for rect, label in self._pause_buttons():
+            pygame.draw.rect(surface, (70,70,70), rect, border_radius=8)
+            t = self._text(label, (255,255,255))
+            surface.blit(t, t.get_rect(center=rect.center))
 
-        # Main Menu button
-        btn = pygame.Rect(w//2 - 60, h//2 + 100, 120, 40)
-        pygame.draw.rect(self.screen, (50,50,50), btn, border_radius=8)
-        lb = self.font.render("Main Menu", True, (255,255,255))
-        self.screen.blit(lb, lb.get_rect(center=btn.center))
-
-        # Handle click
-        for ev in pygame.event.get():
-            if ev.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif ev.type == pygame.MOUSEBUTTONDOWN and btn.collidepoint(pygame.mouse.get_pos()):
-                # 1) Reset summary tracking
-                self._summary_shown = False
-                self.session_wave_stats.clear()
-                # 2) Destroy the current game window
-                pygame.display.quit()
-                # 3) Re-initialize video & open main menu
-                pygame.display.init()
-                self.menu.screen = pygame.display.set_mode((600, 400))
-                pygame.display.set_caption("Tower Defense – Main Menu")
-                # 4) Switch MainMenu state
-                self.menu.state = "main_menu"
-                self.menu.game_started = False
+    def _draw_victory(self):
+        self._draw_summary("VICTORY!", (0,255,0))
 
     def _draw_game_over(self):
-        w, h = self.screen.get_size()
+        self._draw_summary("GAME OVER", (255,0,0))
+
+    def _draw_summary(self, title, color):
+        self._mark_full()
 
         # Compute and cache the session summary (only once)
         if not self._summary_shown:
-            stats = self.session_wave_stats
-            W = len(stats)
-            total_enemies = sum(s["enemies"] for s in stats)
-            total_damage  = sum(s["damage"]   for s in stats)
-            total_spent   = sum(s["currency_spent"] for s in stats)
-            avg_time      = (sum(s["time_ms"] for s in stats) // W) if W else 0
-
-            self._session_summary = {
-                "Waves":         W,
-                "Enemies":       total_enemies,
-                "Damage":        total_damage,
-                "Spent":         total_spent,
-                "Avg Time (ms)": avg_time
-            }
+            self._session_summary = self.sim.session_summary()
             self._summary_shown = True
 
-        # Draw overlay
-        overlay = pygame.Surface((w, h))
-        overlay.set_alpha(180)
-        overlay.fill((0,0,0))
-        self.screen.blit(overlay, (0,0))
+        self._summary_title = (title, color)
+        self._summary_layer.draw(self.screen, key=self._summary_title)
+
+    def _build_summary(self, surface):
+        w, h = surface.get_size()
+        title, color = self._summary_title
 
-        # Game Over text
-        txt = self.font.render("GAME OVER", True, (255,0,0))
-        self.screen.blit(txt, txt.get_rect(center=(w//2, h//2 - 80)))
+        # Title text
+        txt = self._text(title, color)
+        surface.blit(txt, txt.get_rect(center=(w//2, h//2 - 80)))
 
         # Session summary
-        sf = pygame.font.Font(None, 24)
         sx, sy = w//2 - 150, h//2 - 40
         for i, (key, val) in enumerate(self._session_summary.items()):
-            line = sf.render(f"{key}: {val}", True, (255,255,255))
-            self.screen.blit(line, (sx, sy + i*30))
+            line = self._text(f"{key}: {val}", (255,255,255), self.summary_font)
+            surface.blit(line, (sx, sy + i*30))
 
         # Main Menu button
-        btn = pygame.Rect(w//2 - 60, h//2 + 100, 120, 40)
-        pygame.draw.rect(self.screen, (50,50,50), btn, border_radius=8)
-        lb = self.font.render("Main Menu", True, (255,255,255))
-        self.screen.blit(lb, lb.get_rect(center=btn.center))
-
-        # Handle click
-        for ev in pygame.event.get():
-            if ev.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif ev.type == pygame.MOUSEBUTTONDOWN and btn.collidepoint(pygame.mouse.get_pos()):
-                # 1) Reset summary tracking
-                self._summary_shown = False
-                self.session_wave_stats.clear()
-                # 2) Destroy the current game window
-                pygame.display.quit()
-                # 3) Re-init video & open main menu
-                pygame.display.init()
-                self.menu.screen = pygame.display.set_mode((600, 400))
-                pygame.display.set_caption("Tower Defense – Main Menu")
-                # 4) Switch MainMenu state
-                self.menu.state = "main_menu"
-                self.menu.game_started = False
-
+        btn = self.summary_button_rect
+        pygame.draw.rect(surface, (50,50,50), btn, border_radius=8)
+        lb = self._text("Main Menu", (255,255,255))
+        surface.blit(lb, lb.get_rect(center=btn.center))
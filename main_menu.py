@@ -4,23 +4,44 @@ import json
 import glob, os
 from maps import Map
 from game_manager import GameManager
+from renderer import DirtyRectRenderer
+from telemetry import shared_store
+from text_cache import get_font, text_cache
+from overlay import ModalLayer
+import tracing
 from enemy import (
     Goblin, Orc, Troll, Boss,
-    Slime, Werewolf, Werebear, OrcRider
+    Slime, Werewolf, Werebear, OrcRider,
+    preload_enemy_frames
 )
 
 class MainMenu:
-    def __init__(self):
+    def __init__(self, dirty_rects=True, telemetry_db=None, mazing=False,
+                 frame_pacing=True, profile=False):
         pygame.init()
         self.screen = pygame.display.set_mode((600, 400))
         pygame.display.set_caption("Tower Defense – Main Menu")
-        self.font        = pygame.font.Font(None, 50)
-        self.button_font = pygame.font.Font(None, 36)
+        self.font        = get_font(None, 50)
+        self.button_font = get_font(None, 36)
         self.clock       = pygame.time.Clock()
         self.state       = "main_menu"
         self.running     = True
         self.game_started = False
         self.selected_level = "level1"
+        # Push only changed screen regions during gameplay
+        self.dirty_rects    = dirty_rects
+        # Optional SQLite session/wave telemetry file; off by default
+        self.telemetry_db   = telemetry_db
+        # Let towers go on the path too (see maze.py)
+        self.mazing         = mazing
+        # Skip redraws while nothing on screen can change (idle menus,
+        # pause and summary screens) and sleep until input instead
+        self.frame_pacing   = frame_pacing
+        self._enemy_modal   = ModalLayer(self._build_enemy_modal, dim=200)
+        # Start games with the F3 frame profiler overlay on
+        self.profile        = profile
+        # Parsed maps by file, kept across games
+        self._maps          = {}
 
         # Load or initialize level progress
         self.level_progress = self._load_progress()
@@ -60,17 +81,27 @@ class MainMenu:
             rect,
             border_radius=10
         )
-        label = self.button_font.render(text, True, self.WHITE)
+        label = text_cache.render(self.button_font, text, self.WHITE)
         self.screen.blit(label, label.get_rect(center=rect.center))
 
     def run(self):
+        drawn = None   # menu state currently on screen
         while self.running:
+            if self.state == "game":
+                self._start_game()
+                drawn = None
+                continue
+
+            events = pygame.event.get()
+            if self.frame_pacing and drawn == self.state and not events:
+                # menus only change on input (hover, clicks): sleep in the
+                # event queue instead of redrawing the same frame
+                events = [pygame.event.wait()]
+            drawn = self.state
             if self.state == "main_menu":
-                self._show_main_menu()
+                self._show_main_menu(events)
             elif self.state == "level_select":
-                self._show_level_selection()
-            elif self.state == "game":
-                self._start_game()
+                self._show_level_selection(events)
 
             pygame.display.flip()
             self.clock.tick(30)
@@ -78,18 +109,18 @@ class MainMenu:
         pygame.quit()
         sys.exit()
 
-    def _show_main_menu(self):
+    def _show_main_menu(self, events):
         self.screen.blit(self.background, (0, 0))
-        title = self.font.render("Tower Defense", True, self.WHITE)
+        title = text_cache.render(self.font, "Tower Defense", self.WHITE)
         self.screen.blit(title, title.get_rect(center=(300, 60)))
 
         # Only Levels & Quit
         self.draw_button("Levels", 200, 150, 200, 60, self.GRAY, self.LIGHT_GRAY)
         self.draw_button("Quit",   200, 230, 200, 60, self.GRAY, self.LIGHT_GRAY)
-        self._handle_main_menu_events()
+        self._handle_main_menu_events(events)
 
-    def _handle_main_menu_events(self):
-        for e in pygame.event.get():
+    def _handle_main_menu_events(self, events):
+        for e in events:
             if e.type == pygame.QUIT:
                 self.running = False
             elif e.type == pygame.MOUSEBUTTONDOWN:
@@ -101,9 +132,9 @@ class MainMenu:
                 elif 200 <= mx <= 400 and 230 <= my <= 290:
                     self.running = False
 
-    def _show_level_selection(self):
+    def _show_level_selection(self, events):
         self.screen.fill((0, 0, 0))
-        title = self.font.render("Select Level", True, self.WHITE)
+        title = text_cache.render(self.font, "Select Level", self.WHITE)
         self.screen.blit(title, title.get_rect(center=(300, 60)))
 
         for i, (name, data) in enumerate(self.level_progress.items()):
@@ -118,10 +149,10 @@ class MainMenu:
         # Back button
         back_y = 150 + len(self.level_progress) * 80
         self.draw_button("Back", 200, back_y, 200, 60, self.GRAY, self.LIGHT_GRAY)
-        self._handle_level_select_events()
+        self._handle_level_select_events(events)
 
-    def _handle_level_select_events(self):
-        for e in pygame.event.get():
+    def _handle_level_select_events(self, events):
+        for e in events:
             if e.type == pygame.QUIT:
                 self.running = False
             elif e.type == pygame.MOUSEBUTTONDOWN:
@@ -144,6 +175,34 @@ class MainMenu:
 
     def _show_enemy_info_modal(self):
         w, h = self.screen.get_size()
+        cont_rect = pygame.Rect(w//2 - 60, h - 100, 120, 40)
+        types = tuple(getattr(self, "_level_enemy_types", [Goblin, Orc, Troll, Boss]))
+
+        # composed once per roster and window size; the modal is static,
+        # so with frame pacing it is only re-presented when an event
+        # wakes the loop
+        under = self.screen.copy()
+        showing, drawn = True, False
+        while showing:
+            events = pygame.event.get()
+            if self.frame_pacing and drawn and not events:
+                events = [pygame.event.wait()]
+            drawn = True
+
+            for ev in events:
+                if ev.type == pygame.QUIT:
+                    pygame.quit(); sys.exit()
+                elif ev.type == pygame.MOUSEBUTTONDOWN:
+                    if cont_rect.collidepoint(pygame.mouse.get_pos()):
+                        showing = False
+
+            self.screen.blit(under, (0, 0))
+            self._enemy_modal.draw(self.screen, key=types)
+            pygame.display.flip()
+            self.clock.tick(30)
+
+    def _build_enemy_modal(self, surface):
+        w, h = surface.get_size()
         info_map = {
             Goblin:    ("Goblin",    "assets/enemy/skel/right",      "HP:50  Spd:2.0"),
             Orc:       ("Orc",       "assets/enemy/orc/right",       "HP:150 Spd:0.8"),
@@ -155,64 +214,39 @@ class MainMenu:
             OrcRider:  ("OrcRider",  "assets/enemy/orcrider/right","HP:400 Spd:1.2"),
         }
         types = getattr(self, "_level_enemy_types", [Goblin, Orc, Troll, Boss])
-        entries = []
+
+        # title
+        title = text_cache.render(self.font, "Enemies You'll Face", self.WHITE)
+        surface.blit(title, title.get_rect(center=(w//2, 60)))
+
+        # icon sizing & spacing
+        ICON_SIZE = 80
+        SPACING   = ICON_SIZE + 20
+        y = 120
+
+        # draw each entry
         for cls in types:
             name, folder, stats = info_map.get(cls, (cls.__name__, "", ""))
             files = sorted(glob.glob(os.path.join(folder, "*.png")))
-            icon = files[0] if files else None
-            entries.append((name, icon, stats))
+            if files:
+                img = pygame.image.load(files[0]).convert_alpha()
+                img = pygame.transform.scale(img, (ICON_SIZE, ICON_SIZE))
+                surface.blit(img, (w//2 - 200, y))
 
-        cont_rect = pygame.Rect(w//2 - 60, h - 100, 120, 40)
-        clock = pygame.time.Clock()
-        showing = True
+            # vertically center the text next to the icon
+            text_y = y + ICON_SIZE // 2 - 10
+            t_name  = text_cache.render(self.button_font, name,  self.WHITE)
+            t_stats = text_cache.render(self.button_font, stats, self.LIGHT_GRAY)
+            surface.blit(t_name,  (w//2 - 130, text_y))
+            surface.blit(t_stats, (w//2 - 130, text_y + 24))
 
-        while showing:
-            # dark overlay
-            overlay = pygame.Surface((w, h))
-            overlay.set_alpha(200)
-            overlay.fill((0, 0, 0))
-            self.screen.blit(overlay, (0, 0))
-
-            # title
-            title = self.font.render("Enemies You'll Face", True, self.WHITE)
-            self.screen.blit(title, title.get_rect(center=(w//2, 60)))
-
-            # icon sizing & spacing
-            ICON_SIZE = 80
-            SPACING   = ICON_SIZE + 20
-            y = 120
-
-            # draw each entry
-            for name, icon_path, stats in entries:
-                if icon_path:
-                    img = pygame.image.load(icon_path).convert_alpha()
-                    img = pygame.transform.scale(img, (ICON_SIZE, ICON_SIZE))
-                    self.screen.blit(img, (w//2 - 200, y))
-
-                # vertically center the text next to the icon
-                text_y = y + ICON_SIZE // 2 - 10
-                t_name  = self.button_font.render(name,  True, self.WHITE)
-                t_stats = self.button_font.render(stats, True, self.LIGHT_GRAY)
-                self.screen.blit(t_name,  (w//2 - 130, text_y))
-                self.screen.blit(t_stats, (w//2 - 130, text_y + 24))
-
-                y += SPACING
-
-            # continue button
-            pygame.draw.rect(self.screen, self.GRAY, cont_rect, border_radius=8)
-            lbl = self.button_font.render("Continue", True, self.WHITE)
-            self.screen.blit(lbl, lbl.get_rect(center=cont_rect.center))
-
-            pygame.display.flip()
-            clock.tick(30)
-
-            for ev in pygame.event.get():
-                if ev.type == pygame.QUIT:
-                    pygame.quit(); sys.exit()
-                elif ev.type == pygame.MOUSEBUTTONDOWN:
-                    if cont_rect.collidepoint(pygame.mouse.get_pos()):
-                        showing = False
+            y += SPACING
 
+        # continue button
+        cont_rect = pygame.Rect(w//2 - 60, h - 100, 120, 40)
+        pygame.draw.rect(surface, self.GRAY, cont_rect, border_radius=8)
+        lbl = text_cache.render(self.button_font, "Continue", self.WHITE)
+        surface.blit(lbl, lbl.get_rect(center=cont_rect.center))
 
     def _start_game(self):
         level = self.selected_level
@@ -230,52 +264,102 @@ class MainMenu:
         boss_class       = boss_map.get(level, Boss)
         # ─────────────────────────────────────
 
-        # Load map
+        # Load map, once per level: replays and restarts reuse it
         map_path = self.level_progress[level]["file"]
-        self.map = Map(self.screen, map_path, tile_size=40)
+        self.map = self._maps.get(map_path)
+        if self.map is None:
+            self.map = self._maps[map_path] = Map(
+                self.screen, map_path, tile_size=40,
+                composite=True, show_path=True, show_slots=True)
 
         # Resize window
         w, h = self.map.get_size()
         self.screen = pygame.display.set_mode((w, h))
+        self.map.screen = self.screen
         pygame.display.set_caption("Tower Defense – Game")
 
+        renderer = None
+        if self.dirty_rects:
+            renderer = DirtyRectRenderer(self.screen, self.map.get_background())
+
         # Pass roster & boss into GameManager
         self.game_manager = GameManager(
             self.screen,
             self.map,
             self,
             base_enemy_types=base_enemy_types,
-            boss_class=boss_class
+            boss_class=boss_class,
+            renderer=renderer,
+            telemetry=shared_store(self.telemetry_db) if self.telemetry_db else None,
+            mazing=self.mazing,
+            profile=self.profile
         )
         self.game_started = True
 
         # Prepare enemy‐preview modal
-        roster = self.game_manager.enemy_types.copy()
+        roster = self.game_manager.sim.enemy_types.copy()
         if boss_class not in roster:
             roster.insert(0, boss_class)
         self._level_enemy_types = roster
 
+        # Decode the whole roster once so spawns never hit the disk
+        preload_enemy_frames(roster)
+
         self._show_enemy_info_modal()
 
         # Game loop
+        gm = self.game_manager
         while self.game_started:
-            self.screen.fill((0, 0, 0))
-            self.map.draw()
-            self.map.draw_path()
-            self.map.draw_tower_slots()
-            self.game_manager.update()
-
-            for e in pygame.event.get():
+            # None unless the F3 profiler or a trace is on; every lap is guarded
+            prof = gm.profiler
+            if prof:
+                prof.begin_frame()
+            events = pygame.event.get()
+            if self.frame_pacing and gm.idle and not events:
+                # a pause or summary screen is up and nothing moves behind
+                # it: sleep in the event queue instead of redrawing
+                events = [pygame.event.wait()]
+            if prof:
+                prof.lap("events")
+
+            # tiles, path and slots come pre-baked in one blit
+            if renderer:
+                renderer.begin_frame()
+            else:
+                self.map.draw()
+            if prof:
+                prof.lap("map")
+            gm.update()
+
+            for e in events:
                 if e.type == pygame.QUIT:
                     self.running = False
                     self.game_started = False
                 elif e.type == pygame.MOUSEBUTTONDOWN:
-                    self.game_manager.handle_click(pygame.mouse.get_pos())
-
-            pygame.display.flip()
+                    gm.handle_click(pygame.mouse.get_pos())
+                elif e.type == pygame.KEYDOWN:
+                    gm.handle_key(e.key)
+            if not self.game_started:
+                break   # the game window may already be gone
+            if prof:
+                prof.lap("input")
+
+            if renderer:
+                renderer.end_frame()
+            else:
+                pygame.display.flip()
+            if prof:
+                prof.lap("flip")
             self.clock.tick(30)
+            if prof:
+                prof.lap("frame wait")
+                sim = gm.sim
+                prof.end_frame(enemies=len(sim.enemies),
+                               projectiles=len(sim.projectiles.active),
+                               towers=len(sim.towers))
 
 
 if __name__ == "__main__":
+    tracing.start_from_env()
     menu = MainMenu()
     menu.run()
@@ -0,0 +1,214 @@
+"""Compiled map bundles: everything `Map` derives from a TMX, in one file.
+
+A bundle holds the walkable grid as a packed bitmap, the spawn and goal
+tiles, the goal-distance flow field, the pixel path of every spawn, the
+tower points and a pre-scaled tile atlas as raw RGBA,
+behind a small JSON header that records where each section starts:
+
+    b"TDMB" | u32 version | u32 header length | header JSON | sections
+
+Sections are 8-byte aligned, so the file can be read with one `read()`
+(or mmap'd) and sliced without copying. The header carries a key hashed
+from the TMX, its tilesets and their images plus the tile size; a bundle
+whose key no longer matches its sources is ignored and rebuilt.
+"""
+import hashlib
+import json
+import os
+import struct
+import xml.etree.ElementTree as ET
+from array import array
+
+import pygame
+from pytmx.util_pygame import handle_transformation
+
+BUNDLE_DIR     = os.path.join("assets", "cache", "maps")
+BUNDLE_VERSION = 2
+MAGIC          = b"TDMB"
+_PREFIX        = struct.Struct("<4sII")
+
+
+# ─── Keys ────────────────────────────────────────────────────
+
+def source_files(map_path):
+    """The TMX plus every tileset and image it pulls in."""
+    files = [map_path]
+    root  = os.path.dirname(map_path)
+    for ts in ET.parse(map_path).getroot().iter("tileset"):
+        tsx = ts.get("source")
+        if tsx:
+            tsx = os.path.join(root, tsx)
+            files.append(tsx)
+            base = os.path.dirname(tsx)
+            images = ET.parse(tsx).getroot().iter("image")
+        else:
+            base, images = root, ts.iter("image")
+        files.extend(os.path.join(base, img.get("source")) for img in images)
+    return files
+
+
+def bundle_key(map_path, tile_size):
+    h = hashlib.sha1(f"v{BUNDLE_VERSION}:{tile_size}".encode())
+    for fn in source_files(map_path):
+        with open(fn, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def bundle_path(map_path, tile_size, bundle_dir=None):
+    name = os.path.splitext(os.path.basename(map_path))[0]
+    return os.path.join(bundle_dir or BUNDLE_DIR, f"{name}-{tile_size}.mapb")
+
+
+# ─── Writing ─────────────────────────────────────────────────
+
+def image_loader(filename, colorkey, **kwargs):
+    """pytmx image loader that needs no display (no convert()), so
+    headless processes can build bundles too."""
+    image = pygame.image.load(filename)
+
+    def load_image(rect=None, flags=None):
+        tile = image.subsurface(rect).copy() if rect else image
+        return handle_transformation(tile, flags) if flags else tile
+    return load_image
+
+
+def _pack_grid(grid):
+    bits = bytearray((len(grid) * len(grid[0]) + 7) // 8)
+    i = 0
+    for row in grid:
+        for walkable in row:
+            if walkable:
+                bits[i >> 3] |= 1 << (i & 7)
+            i += 1
+    return bytes(bits)
+
+
+def _pad(n):
+    return (-n) % 8
+
+
+def save(m, map_path, key=None, bundle_dir=None):
+    """Write a bundle for an already parsed Map `m`."""
+    ts = m.tile_size
+    # one atlas cell per distinct scaled tile, in first-use order
+    cell_of, cells, placements = {}, [], array("i")
+    for img, x, y in m.tiles:
+        if id(img) not in cell_of:
+            cell_of[id(img)] = len(cells)
+            cells.append(img)
+        placements.extend((cell_of[id(img)], x, y))
+    cols  = max(1, int(len(cells) ** 0.5 + 0.999))
+    rows  = max(1, -(-len(cells) // cols))
+    sheet = pygame.Surface((cols * ts, rows * ts), pygame.SRCALPHA)
+    for i, img in enumerate(cells):
+        sheet.blit(img, ((i % cols) * ts, (i // cols) * ts))
+
+    sections = [("grid", _pack_grid(m.grid)),
+                ("flow", array("i", m.flow.dist).tobytes()),
+                ("tiles", placements.tobytes()),
+                ("pixels", pygame.image.tobytes(sheet, "RGBA"))]
+    header = {
+        "key":          key or bundle_key(map_path, ts),
+        "width":        m.width,
+        "height":       m.height,
+        "tile_size":    ts,
+        "spawns":       [list(t) for t in m.spawn_tiles],
+        "goals":        [list(t) for t in m.goal_tiles],
+        "paths":        [[list(p) for p in path] for path in m.paths],
+        "tower_points": [list(p) for p in m.tower_points],
+        "atlas":        {"cols": cols, "count": len(cells), "size": list(sheet.get_size())},
+        "sections":     {},
+    }
+    # offsets are relative to the end of the header block
+    offset = 0
+    for name, data in sections:
+        header["sections"][name] = [offset, len(data)]
+        offset += len(data) + _pad(len(data))
+    raw = json.dumps(header).encode()
+    raw += b" " * _pad(_PREFIX.size + len(raw))
+
+    path = bundle_path(map_path, ts, bundle_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, BUNDLE_VERSION, len(raw)))
+        f.write(raw)
+        for _, data in sections:
+            f.write(data)
+            f.write(b"\0" * _pad(len(data)))
+    # atomic, so parallel workers building the same bundle never clash
+    os.replace(tmp, path)
+    return path
+
+
+# ─── Reading ─────────────────────────────────────────────────
+
+class MapBundle:
+    """A bundle file read in one go; sections are memoryview slices."""
+
+    def __init__(self, data):
+        magic, version, hlen = _PREFIX.unpack_from(data)
+        if magic != MAGIC or version != BUNDLE_VERSION:
+            raise ValueError("not a current map bundle")
+        self.data   = memoryview(data)
+        self.header = json.loads(bytes(self.data[_PREFIX.size:_PREFIX.size + hlen]))
+        self._base  = _PREFIX.size + hlen
+
+        h = self.header
+        self.key          = h["key"]
+        self.width        = h["width"]
+        self.height       = h["height"]
+        self.tile_size    = h["tile_size"]
+        self.spawn_tiles  = [tuple(t) for t in h["spawns"]]
+        self.goal_tiles   = [tuple(t) for t in h["goals"]]
+        self.paths        = [[tuple(p) for p in path] for path in h["paths"]]
+        self.tower_points = [tuple(p) for p in h["tower_points"]]
+
+    def section(self, name):
+        off, n = self.header["sections"][name]
+        return self.data[self._base + off:self._base + off + n]
+
+    def grid(self):
+        bits, w = self.section("grid"), self.width
+        grid = []
+        for r in range(self.height):
+            base = r * w
+            grid.append([bool(bits[(base + c) >> 3] >> ((base + c) & 7) & 1)
+                         for c in range(w)])
+        return grid
+
+    def flow_dist(self):
+        dist = array("i")
+        dist.frombytes(self.section("flow"))
+        return dist
+
+    def tiles(self):
+        """[(Surface, x, y), ...] in draw order, sliced from the atlas."""
+        atlas, ts = self.header["atlas"], self.tile_size
+        sheet = pygame.image.frombuffer(self.section("pixels"), tuple(atlas["size"]), "RGBA")
+        # convert() copies, so the surface no longer points into the file
+        sheet = sheet.convert_alpha() if pygame.display.get_surface() else sheet.copy()
+        cols = atlas["cols"]
+        cells = [sheet.subsurface(((i % cols) * ts, (i // cols) * ts, ts, ts))
+                 for i in range(atlas["count"])]
+        placements = array("i")
+        placements.frombytes(self.section("tiles"))
+        return [(cells[placements[i]], placements[i + 1], placements[i + 2])
+                for i in range(0, len(placements), 3)]
+
+
+def load(map_path, tile_size, bundle_dir=None):
+    """The bundle for `map_path` at `tile_size`, or None if it is
+    missing, unreadable or stale."""
+    path = bundle_path(map_path, tile_size, bundle_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            bundle = MapBundle(f.read())
+    except (OSError, ValueError, struct.error):
+        return None
+    if bundle.tile_size != tile_size or bundle.key != bundle_key(map_path, tile_size):
+        return None
+    return bundle
@@ -2,48 +2,114 @@ import pygame
 import pytmx
 from pytmx.util_pygame import load_pygame
 import heapq
+from route import Route
+from flow_field import FlowField
+import map_bundle
+import tracing
 
 class Map:
-    def __init__(self, screen, map_path, tile_size=40):
+    def __init__(self, screen, map_path, tile_size=40,
+                 composite=False, show_path=False, show_slots=False,
+                 load_images=True, use_bundle=True):
         self.screen = screen
         self.tile_size = tile_size
-        self.tmx_data = load_pygame(map_path)
+
+        # A compiled bundle (see map_bundle.py) replaces the TMX parse,
+        # tile scaling, grid walk, A* and slot scan with a single read
+        with tracing.span("map_load", "assets", path=map_path) as sp:
+            bundle = map_bundle.load(map_path, tile_size) if use_bundle else None
+            if bundle is not None:
+                self._load_bundle(bundle, load_images)
+            else:
+                self._parse(map_path, load_images, use_bundle)
+                if use_bundle:
+                    try:
+                        map_bundle.save(self, map_path)
+                    except OSError as e:
+                        print(f"[Map Bundle Error] {e}")
+            if sp is not None:
+                sp.args["source"] = "bundle" if bundle is not None else "tmx"
+
+        # Path debug draw settings
+        self.path_color      = (255, 0, 0)
+        self.path_thickness  = 3
+        self.path_point_rad  = 5
+
+        # Compositing: bake tiles (+ overlays) into one cached Surface
+        self.composite       = composite
+        self.show_path       = show_path
+        self.show_slots      = show_slots
+        self._background     = None
+        self._background_key = None
+        if self.composite:
+            self.get_background()
+
+    def _parse(self, map_path, load_images, use_bundle):
+        # load_images=False parses only the TMX data (no display, no
+        # tileset decoding) for headless simulation, unless a bundle is
+        # about to be written and needs the tiles
+        if load_images:
+            self.tmx_data = load_pygame(map_path)
+        elif use_bundle:
+            self.tmx_data = pytmx.TiledMap(map_path, image_loader=map_bundle.image_loader)
+        else:
+            self.tmx_data = pytmx.TiledMap(map_path)
 
         # Map in tiles
         self.width  = self.tmx_data.width
         self.height = self.tmx_data.height
 
         # Load visuals
-        self.tiles = self._load_tiles()
+        self.tiles = self._load_tiles() if load_images or use_bundle else []
 
         # Build a boolean grid of walkable (path) vs blocked
         self._build_grid()
 
-        # Find the two endpoints of the path layer
-        self.start_tile, self.goal_tile = self._find_path_endpoints()
+        # Entrances and exits of the path layer
+        self.spawn_tiles, self.goal_tiles = self._find_path_endpoints()
 
-        # Compute the pixel-perfect path once
-        self.path = self._compute_pixel_path()
+        # Goal-distance flow field, then one route per spawn down it
+        self.flow = FlowField(self.grid, self.goal_tiles)
+        self._set_paths(self._compute_pixel_paths())
 
         # Tower points unchanged
         self.tower_points = self._load_tower_points()
 
-        # Path debug draw settings
-        self.path_color      = (255, 0, 0)
-        self.path_thickness  = 3
-        self.path_point_rad  = 5
+    def _load_bundle(self, bundle, load_images):
+        self.tmx_data     = None
+        self.width        = bundle.width
+        self.height       = bundle.height
+        self.tiles        = bundle.tiles() if load_images else []
+        self.grid         = bundle.grid()
+        self.spawn_tiles  = bundle.spawn_tiles
+        self.goal_tiles   = bundle.goal_tiles
+        self.flow         = FlowField(self.grid, self.goal_tiles, bundle.flow_dist())
+        self.tower_points = bundle.tower_points
+        self._set_paths(bundle.paths)
+
+    def _set_paths(self, paths):
+        # pixel path per spawn, plus its arc-length parameterization
+        # shared read-only by every enemy on it; the first one doubles
+        # as the map's main path
+        self.paths  = paths or [[]]
+        self.routes = [Route(p) for p in self.paths]
+        self.path   = self.paths[0]
+        self.route  = self.routes[0]
+        self.start_tile = self.spawn_tiles[0]
+        self.goal_tile  = self.goal_tiles[0]
 
     def _load_tiles(self):
-        out = []
+        # scale each distinct tile once; placements share the Surface
+        out, scaled = [], {}
         for layer in self.tmx_data.visible_layers:
             if isinstance(layer, pytmx.TiledTileLayer):
                 for x, y, gid in layer:
-                    tile = self.tmx_data.get_tile_image_by_gid(gid)
-                    if tile:
-                        out.append((
-                            pygame.transform.scale(tile, (self.tile_size, self.tile_size)),
-                            x*self.tile_size, y*self.tile_size
-                        ))
+                    if gid not in scaled:
+                        tile = self.tmx_data.get_tile_image_by_gid(gid)
+                        scaled[gid] = tile and pygame.transform.scale(
+                            tile, (self.tile_size, self.tile_size))
+                    if scaled[gid]:
+                        out.append((scaled[gid], x*self.tile_size, y*self.tile_size))
         return out
 
     def _build_grid(self):
@@ -56,7 +122,26 @@ class Map:
                 row.append(path_layer.data[y][x] != 0)
             self.grid.append(row)
 
+    def _marked_tiles(self, layer_name):
+        try:
+            layer = self.tmx_data.get_layer_by_name(layer_name)
+        except ValueError:
+            return []
+        return [(r, c)
+                for r in range(layer.height)
+                for c in range(layer.width)
+                if layer.data[r][c] != 0]
+
     def _find_path_endpoints(self):
+        """([spawn tiles], [goal tiles]).
+
+        Optional "spawn" and "goal" tile layers mark entrances and exits
+        explicitly. Otherwise dead ends of the path layer are used: the
+        last one in scan order is the goal, every other one a spawn.
+        """
+        spawns = self._marked_tiles("spawn")
+        goals  = self._marked_tiles("goal")
+
         # collect all path tiles
         pts = [(r, c)
                for r in range(self.height)
@@ -72,11 +157,14 @@ class Map:
 
         # endpoints have exactly one neighbor
         ends = [pt for pt in pts if len(list(neighbors(*pt))) == 1]
-        if len(ends) >= 2:
-            return ends[0], ends[-1]
-        else:
+        if len(ends) < 2:
             # fallback: first and last in scan order
-            return pts[0], pts[-1]
+            ends = [pts[0], pts[-1]]
+        if not goals:
+            goals = [next((e for e in reversed(ends) if e not in spawns), ends[-1])]
+        if not spawns:
+            spawns = [e for e in ends if e not in goals] or [ends[0]]
+        return spawns, goals
 
     def _astar(self, start, goal):
         """Returns list of (r,c) from start to goal or empty if none."""
@@ -119,22 +207,70 @@ class Map:
         return (c*self.tile_size + self.tile_size//2,
                 r*self.tile_size + self.tile_size//2)
 
-    def _compute_pixel_path(self):
-        tile_path = self._astar(self.start_tile, self.goal_tile)
-        return [self._tile_to_pixel(r, c) for r, c in tile_path]
+    def _compute_pixel_paths(self):
+        paths = []
+        for spawn in self.spawn_tiles:
+            tile_path = self.flow.trace(spawn)
+            if not tile_path:
+                print(f"[Path Error] spawn {spawn} cannot reach a goal")
+                continue
+            paths.append([self._tile_to_pixel(r, c) for r, c in tile_path])
+        return paths
+
+    def set_walkable(self, r, c, walkable):
+        """Open or block one path tile. The flow field is patched only
+        where distances change; returns True if the routes changed."""
+        self.grid[r][c] = walkable
+        if not self.flow.set_walkable(r, c, walkable):
+            return False
+        self._set_paths(self._compute_pixel_paths())
+        self._background = None
+        return True
 
     # Public API
     def draw(self):
+        if self.composite:
+            self.screen.blit(self.get_background(), (0, 0))
+            return
         for img, x, y in self.tiles:
             self.screen.blit(img, (x,y))
 
-    def draw_path(self):
-        if len(self.path) > 1:
-            pygame.draw.lines(self.screen, self.path_color, False,
-                              self.path, self.path_thickness)
-        for pt in self.path:
-            pygame.draw.circle(self.screen, self.path_color,
-                               pt, self.path_point_rad)
+    def get_background(self):
+        """Return the cached static layer, rebuilding it only when the
+        tile size or an overlay toggle changed since the last build."""
+        key = (self.tile_size, self.show_path, self.show_slots)
+        if self._background is None or key != self._background_key:
+            self._background     = self._render_background()
+            self._background_key = key
+        return self._background
+
+    def set_overlays(self, show_path=None, show_slots=None):
+        if show_path is not None:
+            self.show_path = show_path
+        if show_slots is not None:
+            self.show_slots = show_slots
+
+    def _render_background(self):
+        surface = pygame.Surface(self.get_size())
+        if pygame.display.get_surface():
+            surface = surface.convert()
+        for img, x, y in self.tiles:
+            surface.blit(img, (x, y))
+        if self.show_path:
+            self.draw_path(surface)
+        if self.show_slots:
+            self.draw_tower_slots(surface)
+        return surface
+
+    def draw_path(self, surface=None):
+        surface = surface or self.screen
+        for path in self.paths:
+            if len(path) > 1:
+                pygame.draw.lines(surface, self.path_color, False,
+                                  path, self.path_thickness)
+            for pt in path:
+                pygame.draw.circle(surface, self.path_color,
+                                   pt, self.path_point_rad)
 
     def get_path(self):
         # return a fresh copy each time if you like:
@@ -159,7 +295,8 @@ class Map:
     def get_tower_points(self):
         return self.tower_points
 
-    def draw_tower_slots(self):
+    def draw_tower_slots(self, surface=None):
+        surface = surface or self.screen
         for px, py in self.tower_points:
-            pygame.draw.circle(self.screen, (0, 255, 0), (px, py), 12)
-            pygame.draw.circle(self.screen, (255, 255, 255), (px, py), 12, 2)
+            pygame.draw.circle(surface, (0, 255, 0), (px, py), 12)
+            pygame.draw.circle(surface, (255, 255, 255), (px, py), 12, 2)
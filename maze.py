@@ -0,0 +1,261 @@
+"""Mazing: towers built on walkable tiles, routes repaired around them.
+
+A placement is refused if it would cut a spawn, or a tile an enemy is
+standing on, off from every goal. Accepted placements patch the map's
+flow field in place (only the tiles whose distance changes are
+touched), and enemies already on the field get a new route from where
+they stand.
+
+Validation has to fit in a frame on large maps, so it goes, cheapest
+first:
+
+  1. the 8 tiles around the candidate stay connected without it: it
+     cannot disconnect anything (O(1));
+  2. a cut-vertex index of the walkable grid answers "which tiles would
+     this cut off" from DFS intervals (O(enemies));
+  3. while that index is being rebuilt after a change, a search around
+     the candidate from each of its neighbours for a tile nearer the
+     goals. It stops after `trial_nodes` tiles and refuses the placement
+     if it runs out, so it never costs a whole flow-field update.
+
+The index is a Tarjan DFS rooted at the goals. It costs O(tiles), so it
+is rebuilt a slice at a time from `update()`, once per frame.
+"""
+import time
+from array import array
+from collections import deque
+
+from flow_field import INF
+from route import Route
+
+# the 8 tiles around a tile, in ring order: consecutive ones touch
+RING = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+
+class CutIndex:
+    """Cut vertices of a FlowField's walkable grid, seen from its goals.
+
+    DFS discovery times, the last discovery time in each subtree and
+    Tarjan low-links, built by a resumable DFS so the work can be spread
+    over frames.
+    """
+
+    def __init__(self, flow, chunk=512):
+        self.flow  = flow
+        self.chunk = chunk
+        self.ready = False
+        self._build = self._dfs()
+
+    def advance(self, deadline_ns):
+        """Build until done or `deadline_ns` (perf_counter_ns) passes;
+        returns True once the index is ready."""
+        while not self.ready and time.perf_counter_ns() < deadline_ns:
+            next(self._build, None)
+        return self.ready
+
+    def _dfs(self):
+        flow = self.flow
+        w, h, walk = flow.width, flow.height, flow.walkable
+        n = w * h
+        disc   = self.disc   = array("i", bytes(4 * n))
+        low    = self.low    = array("i", bytes(4 * n))
+        fin    = self.fin    = array("i", bytes(4 * n))
+        parent = self.parent = array("i", [-1]) * n
+        goals  = flow._goal_idx
+        t, steps = 1, 0
+
+        for root in goals:
+            if disc[root] or not walk[root]:
+                continue
+            # every goal hangs off one virtual root, so a goal anywhere in
+            # a subtree is a way out of it (low-link 0)
+            disc[root], low[root] = t, 0
+            t += 1
+            stack = [(root, 0)]
+            while stack:
+                u, k = stack[-1]
+                if k < 4:
+                    stack[-1] = (u, k + 1)
+                    r, c = divmod(u, w)
+                    if k == 0:
+                        v = u + w if r + 1 < h else -1
+                    elif k == 1:
+                        v = u - w if r > 0 else -1
+                    elif k == 2:
+                        v = u + 1 if c + 1 < w else -1
+                    else:
+                        v = u - 1 if c > 0 else -1
+                    if v < 0 or not walk[v]:
+                        continue
+                    if not disc[v]:
+                        parent[v] = u
+                        disc[v] = t
+                        low[v]  = 0 if v in goals else t
+                        t += 1
+                        stack.append((v, 0))
+                        steps += 1
+                        if steps % self.chunk == 0:
+                            yield
+                    elif v != parent[u] and disc[v] < low[u]:
+                        low[u] = disc[v]
+                else:
+                    stack.pop()
+                    fin[u] = t - 1
+                    p = parent[u]
+                    if p >= 0 and low[u] < low[p]:
+                        low[p] = low[u]
+        self.ready = True
+
+    def separates(self, i, tiles):
+        """True if removing tile `i` leaves any of `tiles` (flat indices)
+        with no way to a goal."""
+        disc, low, fin, parent = self.disc, self.low, self.fin, self.parent
+        if not disc[i]:
+            return False        # not connected to a goal to begin with
+        for u in self.flow._neighbours(i):
+            # each DFS child whose subtree has no edge around `i`
+            if parent[u] == i and low[u] >= disc[i]:
+                lo, hi = disc[u], fin[u]
+                if any(lo <= disc[t] <= hi for t in tiles):
+                    return True
+        return False
+
+
+class Maze:
+    """Tower placement on a Map's walkable tiles."""
+
+    def __init__(self, map_obj, index_budget_ms=2, trial_nodes=4000):
+        self.map   = map_obj
+        self.flow  = map_obj.flow
+        self.index_budget_ns = int(index_budget_ms * 1_000_000)
+        self.trial_nodes     = trial_nodes
+        self.index = CutIndex(self.flow)
+
+    @property
+    def routes(self):
+        return self.map.routes
+
+    def tile_at(self, x, y):
+        ts = self.map.tile_size
+        return int(y // ts), int(x // ts)
+
+    def is_open(self, r, c):
+        return 0 <= r < self.map.height and 0 <= c < self.map.width and self.map.grid[r][c]
+
+    def update(self):
+        """Spend this frame's slice on the cut index, if it is stale."""
+        if not self.index.ready:
+            self.index.advance(time.perf_counter_ns() + self.index_budget_ns)
+
+    # ─── Validation ──────────────────────────────────────────
+
+    def _locally_redundant(self, r, c):
+        # walkable runs around the ring that touch an orthogonal
+        # neighbour; with at most one, every path through (r, c) can
+        # step around it
+        ring = [self.is_open(r + dr, c + dc) for dr, dc in RING]
+        runs = 0
+        for k in range(0, 8, 2):
+            if ring[k] and not (ring[k - 1] and ring[k - 2]):
+                runs += 1
+        return runs <= 1
+
+    def _trial(self, i, tiles):
+        # True if blocking `i` seals none of `tiles`, None if that was not
+        # settled within `trial_nodes`. A tile nearer the goals than `i`
+        # has a shortest way out that does not run through it, so each
+        # neighbour searches around `i` until it meets one; a search that
+        # runs dry has mapped the whole region `i` would seal.
+        flow = self.flow
+        dist, walk = flow.dist, flow.walkable
+        d0 = dist[i]
+        if d0 >= INF:
+            return True         # cut off already: nothing runs through it
+        budget = self.trial_nodes
+        safe = set()
+        for n in flow._neighbours(i):
+            if not walk[n] or n in safe or dist[n] < d0:
+                continue
+            seen, queue, found = {n}, deque([n]), False
+            while queue and not found:
+                u = queue.popleft()
+                for v in flow._neighbours(u):
+                    if v == i or v in seen or not walk[v]:
+                        continue
+                    if dist[v] < d0 or v in safe:
+                        found = True
+                        break
+                    seen.add(v)
+                    queue.append(v)
+                    budget -= 1
+                    if budget <= 0:
+                        return None
+            if found:
+                safe |= seen
+            elif not tiles.isdisjoint(seen):
+                return False
+        return True
+
+    def _check(self, r, c, keep):
+        if not self.is_open(r, c):
+            return False
+        w = self.flow.width
+        tiles = set(self.map.spawn_tiles)
+        tiles.update(keep)
+        if (r, c) in tiles or (r, c) in self.map.goal_tiles:
+            return False
+        if self._locally_redundant(r, c):
+            return True
+        dist = self.flow.dist
+        # tiles already cut off (dist INF) have nothing left to lose
+        flat = {i for i in (tr * w + tc for tr, tc in tiles) if dist[i] < INF}
+        self.update()
+        if self.index.ready:
+            return not self.index.separates(r * w + c, flat)
+        # index still being rebuilt: a bounded search, refusing if the
+        # budget runs out before it settles the question
+        return bool(self._trial(r * w + c, flat))
+
+    def can_block(self, r, c, keep=()):
+        """Whether a tower may go on tile (r, c); `keep` are the tiles
+        enemies are standing on. The connectivity part of a True answer
+        holds until the grid next changes, so it can be passed to `block`
+        as `checked`."""
+        return self._check(r, c, keep)
+
+    # ─── Changes ─────────────────────────────────────────────
+
+    def block(self, r, c, keep=(), checked=False):
+        """Put a tower on tile (r, c) unless that would seal the route;
+        `checked` skips the connectivity check already done by
+        `can_block` since the last change. `keep` is always tested, as
+        enemies move in between. Returns True if placed; the map's routes
+        are repaired in place."""
+        if checked:
+            ok = self.is_open(r, c) and (r, c) not in keep
+        else:
+            ok = self._check(r, c, keep)
+        if ok:
+            self.map.set_walkable(r, c, False)
+            self.index = CutIndex(self.flow)
+        return ok
+
+    def unblock(self, r, c):
+        """Free tile (r, c) again (the tower on it was sold)."""
+        self.map.set_walkable(r, c, True)
+        self.index = CutIndex(self.flow)
+
+    def route_from(self, x, y):
+        """A Route from pixel (x, y) down the flow field, or None if the
+        tile there has no way to a goal."""
+        m = self.map
+        tiles = self.flow.trace(self.tile_at(x, y))
+        if not tiles:
+            return None
+        points = [m._tile_to_pixel(r, c) for r, c in tiles]
+        if len(points) > 1:
+            (cx, cy), (nx, ny) = points[0], points[1]
+            # already past the centre of its tile, heading the right way
+            if (x - cx) * (nx - cx) + (y - cy) * (ny - cy) > 0:
+                points.pop(0)
+        return Route([(x, y)] + points)
@@ -0,0 +1,37 @@
+"""Full-screen modals composed once and blitted as a single Surface.
+
+A modal (pause menu, victory / game-over summary, enemy preview) is a
+translucent dim plus text, buttons and icons that do not change while it
+is up. `ModalLayer` draws all of that into one per-pixel-alpha Surface
+the first time it is shown and hands the same Surface back until its
+key (screen size plus whatever the content depends on) changes.
+"""
+import pygame
+
+
+class ModalLayer:
+    """`build(surface)` draws the modal's content over a black dim of
+    alpha `dim`; the result is cached per (size, key)."""
+
+    def __init__(self, build, dim=180):
+        self.build    = build
+        self.dim      = dim
+        self.builds   = 0
+        self._surface = None
+        self._key     = None
+
+    def surface(self, size, key=None):
+        if self._surface is None or (size, key) != self._key:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            surf.fill((0, 0, 0, self.dim))
+            self.build(surf)
+            self._surface, self._key = surf, (size, key)
+            self.builds += 1
+        return self._surface
+
+    def draw(self, screen, key=None):
+        """Blit the modal over `screen`; returns the rect touched."""
+        return screen.blit(self.surface(screen.get_size(), key), (0, 0))
+
+    def invalidate(self):
+        self._surface = None
@@ -0,0 +1,246 @@
+"""Columnar export of gameplay and batch-simulation telemetry.
+
+Converts the SQLite telemetry store and `batch_sim.py` result files into
+Parquet datasets partitioned by level and date,
+
+    <out>/waves/level=level1/date=2026-10-17/part-db-game_stats-1a2b3c4d.parquet
+    <out>/kills/level=level1/date=2026-10-17/part-batch-results-5e6f7a8b.parquet
+
+with typed columns, dictionary-encoded names, and rows written in
+row-group-sized batches. `read_table` reads back only the columns and
+level asked for.
+
+Each source (a database or a results file) owns one file per partition,
+named after it, and an export rewrites all of them: exporting the same
+source again replaces its rows instead of adding a second copy, so the
+export can run periodically.
+
+    python parquet_export.py --db game_stats.db --batch results.jsonl
+
+Needs pyarrow (pip install pyarrow); without it the export refuses with a
+clear message and the game and the CSV/SQLite sinks are unaffected.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from collections import defaultdict
+from datetime import date
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for columnar export
+    pa = None
+
+PARTITION_BY = ("level", "date")
+
+if pa is not None:
+    _name = pa.dictionary(pa.int32(), pa.string())
+
+    # level and date live in the partition path, not in the files
+    WAVE_SCHEMA = pa.schema([
+        ("session_id",     _name),
+        ("source",         _name),
+        ("wave",           pa.int16()),
+        ("enemies",        pa.int32()),
+        ("towers_placed",  pa.int16()),
+        ("effectiveness",  pa.float32()),
+        ("damage",         pa.int64()),
+        ("time_ms",        pa.int32()),
+        ("currency_spent", pa.int32()),
+        ("params",         _name),
+    ])
+    KILL_SCHEMA = pa.schema([
+        ("session_id", _name),
+        ("source",     _name),
+        ("wave",       pa.int16()),
+        ("enemy_type", _name),
+        ("count",      pa.int32()),
+    ])
+
+
+def available():
+    return pa is not None
+
+
+def _require():
+    if pa is None:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+
+def source_name(kind, path):
+    """File name stem for everything exported from `path`."""
+    stem   = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:8]
+    return f"{kind}-{stem}-{digest}"
+
+
+class PartitionedWriter:
+    """Buffers rows per (level, date) partition and writes each full
+    buffer as one row group of that partition's `part-<name>.parquet`.
+
+    Files are written under a temporary name and swapped in on close;
+    `name` files left in partitions this export did not touch are
+    removed, so the dataset holds exactly this export's rows for `name`.
+    """
+
+    def __init__(self, root, schema, name, row_group_rows=65536):
+        _require()
+        self.root    = root
+        self.schema  = schema
+        self.filename = f"part-{name}.parquet"
+        self.row_group_rows = row_group_rows
+        self.rows    = 0
+        self._buffers = defaultdict(list)
+        self._writers = {}
+
+    def write(self, row):
+        key = tuple(str(row[k]) for k in PARTITION_BY)
+        buf = self._buffers[key]
+        buf.append(row)
+        self.rows += 1
+        if len(buf) >= self.row_group_rows:
+            self._flush(key)
+
+    def _flush(self, key):
+        rows = self._buffers.pop(key, None)
+        if not rows:
+            return
+        entry = self._writers.get(key)
+        if entry is None:
+            folder = os.path.join(self.root, *(f"{k}={v}" for k, v in zip(PARTITION_BY, key)))
+            os.makedirs(folder, exist_ok=True)
+            # dot-prefixed, so dataset readers skip it until it is swapped in
+            tmp = os.path.join(folder, f".{self.filename}.{os.getpid()}.tmp")
+            writer = pq.ParquetWriter(tmp, self.schema, compression="zstd")
+            entry = self._writers[key] = (writer, tmp, os.path.join(folder, self.filename))
+        table = pa.Table.from_pylist(rows, schema=self.schema)
+        entry[0].write_table(table, row_group_size=len(rows))
+
+    def close(self, commit=True):
+        """Finish every file; without `commit` they are discarded and the
+        dataset is left as it was."""
+        if commit:
+            for key in list(self._buffers):
+                self._flush(key)
+        self._buffers.clear()
+        written = set()
+        for writer, tmp, path in self._writers.values():
+            writer.close()
+            if commit:
+                os.replace(tmp, path)
+                written.add(path)
+            else:
+                os.remove(tmp)
+        self._writers.clear()
+        if commit:
+            self._remove_stale(written)
+
+    def _remove_stale(self, written):
+        # partitions this source no longer has rows in
+        for folder, _, files in os.walk(self.root):
+            path = os.path.join(folder, self.filename)
+            if self.filename in files and path not in written:
+                os.remove(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(commit=exc_type is None)
+
+
+# ─── Sources ─────────────────────────────────────────────────
+
+def export_db(db_path, out_dir, fetch_rows=10000):
+    """Stream the telemetry database's waves and kills into Parquet,
+    replacing whatever an earlier export of `db_path` wrote."""
+    _require()
+    con = sqlite3.connect(db_path)
+    name  = source_name("db", db_path)
+    waves = PartitionedWriter(os.path.join(out_dir, "waves"), WAVE_SCHEMA, name)
+    kills = PartitionedWriter(os.path.join(out_dir, "kills"), KILL_SCHEMA, name)
+    with waves, kills:
+        cur = con.execute(
+            "SELECT session_id, level, substr(recorded_at, 1, 10), wave, enemies, "
+            "towers_placed, effectiveness, damage, time_ms, currency_spent FROM waves")
+        cols = ("session_id", "level", "date", "wave", "enemies", "towers_placed",
+                "effectiveness", "damage", "time_ms", "currency_spent")
+        while rows := cur.fetchmany(fetch_rows):
+            for r in rows:
+                waves.write(dict(zip(cols, r), source="game", params=None))
+
+        cur = con.execute(
+            "SELECT k.session_id, s.level, substr(s.started_at, 1, 10), k.wave, "
+            "k.enemy_type, k.count FROM kills k JOIN sessions s ON s.id = k.session_id")
+        cols = ("session_id", "level", "date", "wave", "enemy_type", "count")
+        while rows := cur.fetchmany(fetch_rows):
+            for r in rows:
+                kills.write(dict(zip(cols, r), source="game"))
+    con.close()
+    return waves.rows, kills.rows
+
+
+def export_batch(results_path, out_dir, day=None):
+    """Flatten batch_sim.py JSONL results (one game per line) into rows,
+    replacing whatever an earlier export of `results_path` wrote."""
+    _require()
+    day = day or date.today().isoformat()
+    name  = source_name("batch", results_path)
+    waves = PartitionedWriter(os.path.join(out_dir, "waves"), WAVE_SCHEMA, name)
+    kills = PartitionedWriter(os.path.join(out_dir, "kills"), KILL_SCHEMA, name)
+    with waves, kills, open(results_path) as f:
+        for line in f:
+            try:
+                game = json.loads(line)
+            except ValueError:
+                continue  # partial last line from an interrupted sweep
+            session = f"batch-{game['seed']}-{game['run_id']}"
+            params  = json.dumps(game["params"], sort_keys=True)
+            level   = game.get("level", "unknown")
+            for w in game["waves"]:
+                waves.write(dict(w, session_id=session, source="batch", params=params,
+                                 level=level, date=day))
+                for enemy_type, count in w.get("kills", {}).items():
+                    kills.write({"session_id": session, "source": "batch",
+                                 "wave": w["wave"], "enemy_type": enemy_type,
+                                 "count": count, "level": level, "date": day})
+    return waves.rows, kills.rows
+
+
+# ─── Reading ─────────────────────────────────────────────────
+
+def read_table(root, columns=None, level=None):
+    """Load a partitioned dataset into pandas, reading only `columns`
+    (partition columns included) and, optionally, one level."""
+    _require()
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    filt = ds.field("level") == level if level else None
+    return dataset.to_table(columns=columns, filter=filt).to_pandas()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export telemetry to Parquet")
+    parser.add_argument("--db", help="SQLite telemetry database")
+    parser.add_argument("--batch", action="append", default=[],
+                        help="batch_sim.py results file (repeatable)")
+    parser.add_argument("--out", default="telemetry_parquet")
+    args = parser.parse_args(argv)
+
+    if not available():
+        print("pyarrow is not installed; nothing exported (pip install pyarrow)",
+              file=sys.stderr)
+        return 1
+    if args.db:
+        print("%s: %d wave rows, %d kill rows" % ((args.db,) + export_db(args.db, args.out)))
+    for path in args.batch:
+        print("%s: %d wave rows, %d kill rows" % ((path,) + export_batch(path, args.out)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
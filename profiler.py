@@ -0,0 +1,128 @@
+"""Per-frame phase timings with an on-screen p50/p95/p99 overlay.
+
+The game loop brackets a frame with `begin_frame()` / `end_frame()` and
+calls `lap(name)` after each phase; a lap charges the time since the
+previous one to `name`, so phases that run several times a frame (one
+per simulation tick) add up. Each phase keeps its per-frame totals in a
+ring buffer of the last `frames` frames.
+
+Callers hold the profiler in a variable that is None while profiling is
+off and guard every lap with `if prof:`, so a disabled profiler costs a
+truth test per phase and nothing else. With a `tracer` (tracing.py) set,
+the laps of each sampled frame are also recorded as trace spans.
+"""
+import gc
+import sys
+import time
+from array import array
+
+import pygame
+
+PERCENTILES = (50, 95, 99)
+
+
+class FrameProfiler:
+    def __init__(self, frames=240, refresh=15):
+        self.size    = frames
+        self.refresh = refresh   # frames between overlay rebuilds
+        self.frames  = 0
+        self.phases  = {}        # name -> ring of per-frame ns
+        self.allocs  = array("q", bytes(8 * frames))   # net blocks per frame
+        self.counts  = {}        # entity counts at the last end_frame
+        self.gc_runs = [0, 0, 0]
+        self._acc    = {}
+        self._start  = self._last = 0
+        self._blocks = 0
+        self._panel  = None
+        self._panel_frame = -1
+        self.tracer  = None
+        self._trace  = None      # tracer, if this frame is sampled
+        gc.callbacks.append(self._on_gc)
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self.gc_runs[info["generation"]] += 1
+
+    # ─── Recording ───────────────────────────────────────────
+
+    def begin_frame(self):
+        self._acc.clear()
+        self._blocks = sys.getallocatedblocks()
+        tracer = self.tracer
+        self._trace = tracer if tracer is not None and tracer.sample_frame() else None
+        self._start = self._last = time.perf_counter_ns()
+
+    def lap(self, name):
+        now = time.perf_counter_ns()
+        self._acc[name] = self._acc.get(name, 0) + now - self._last
+        if self._trace:
+            self._trace.complete(name, "frame", self._last, now)
+        self._last = now
+
+    def end_frame(self, **counts):
+        """Close the frame; `counts` are entity counts to display."""
+        now = time.perf_counter_ns()
+        acc = self._acc
+        acc["frame"] = now - self._start
+        i = self.frames % self.size
+        for name in acc:
+            if name not in self.phases:
+                self.phases[name] = array("q", bytes(8 * self.size))
+        for name, ring in self.phases.items():
+            ring[i] = acc.get(name, 0)
+        self.allocs[i] = sys.getallocatedblocks() - self._blocks
+        self.counts = counts
+        self.frames += 1
+        if self._trace:
+            self._trace.complete("frame", "frame", self._start, now, counts)
+
+    # ─── Reporting ───────────────────────────────────────────
+
+    def _window(self, ring):
+        return sorted(ring[:min(self.frames, self.size)])
+
+    def percentiles(self, name):
+        """(p50, p95, p99) of phase `name` over the window, in ns."""
+        ring = self.phases.get(name)
+        values = self._window(ring) if ring else []
+        if not values:
+            return (0, 0, 0)
+        last = len(values) - 1
+        return tuple(values[min(last, p * len(values) // 100)] for p in PERCENTILES)
+
+    def report(self):
+        """Text lines for the overlay, slowest phase (by p95) first."""
+        rows = sorted(((n, self.percentiles(n)) for n in self.phases if n != "frame"),
+                      key=lambda row: -row[1][1])
+        lines = ["phase          p50    p95    p99  ms"]
+        for name, pct in [("frame", self.percentiles("frame"))] + rows:
+            lines.append("%-12s" % name + "".join("%7.2f" % (v / 1e6) for v in pct))
+        allocs = self._window(self.allocs)
+        if allocs:
+            n = len(allocs) - 1
+            lines.append("alloc blocks/frame p50 %d  p99 %d"
+                         % (allocs[n // 2], allocs[min(n, 99 * len(allocs) // 100)]))
+        lines.append("gc runs gen0/1/2: %d/%d/%d" % tuple(self.gc_runs))
+        if self.counts:
+            lines.append("  ".join(f"{k}: {v}" for k, v in self.counts.items()))
+        return lines
+
+    def draw(self, surface, font, pos=(10, 110)):
+        """Blit the overlay panel; it is re-rendered every `refresh`
+        frames, not every frame. Returns the rect touched."""
+        if self._panel is None or self.frames - self._panel_frame >= self.refresh:
+            lines = [font.render(line, True, (230, 230, 230)) for line in self.report()]
+            w = max(s.get_width() for s in lines) + 12
+            h = sum(s.get_height() for s in lines) + 12
+            panel = pygame.Surface((w, h), pygame.SRCALPHA)
+            panel.fill((0, 0, 0, 170))
+            y = 6
+            for s in lines:
+                panel.blit(s, (6, y))
+                y += s.get_height()
+            self._panel, self._panel_frame = panel, self.frames
+        return surface.blit(self._panel, pos)
@@ -1,10 +1,36 @@
 import pygame
+import heapq
+import math
+
+# Shared 8x8 bullet surface per projectile style
+PROJECTILE_STYLES = {
+    "bullet": (255, 255, 0),
+    "ice":    (0, 191, 255),
+}
+_surfaces = {}
+
+def bullet_surface(style):
+    """One pre-built Surface per style, shared by every projectile."""
+    surf = _surfaces.get(style)
+    if surf is None:
+        surf = pygame.Surface((8, 8))
+        surf.fill(PROJECTILE_STYLES[style])
+        _surfaces[style] = surf
+    return surf
 
 class Projectile:
     def __init__(self, x, y, target, damage, speed=5,
-                 slow_effect=None, slow_duration=0):
+                 slow_effect=None, slow_duration=0,
+                 style="bullet"):
+        self.reset(x, y, target, damage, speed,
+                   slow_effect, slow_duration, style)
+
+    def reset(self, x, y, target, damage, speed=5,
+              slow_effect=None, slow_duration=0, style="bullet"):
+        """(Re)initialise in place, so pooled projectiles can be reused."""
         self.x = x
         self.y = y
+        self.prev_x, self.prev_y = x, y
         self.target = target
         self.damage = damage
         self.speed = speed
@@ -12,12 +38,20 @@ class Projectile:
         self.slow_duration = slow_duration
         self.alive = True
 
-        # Visual bullet
-        self.image = pygame.Surface((8, 8))
-        self.image.fill((255, 255, 0))
-        self.rect = self.image.get_rect(center=(x, y))
+        # Visual bullet style
+        self.style = style
+
+        # Set by HitScheduler: the flight is then purely visual, drawn by
+        # interpolating origin -> impact point on the simulation clock
+        self.clock = None
 
-    def update(self):
+    @property
+    def image(self):
+        return bullet_surface(self.style)
+
+    def update(self, now, step_scale=1.0):
+        """Advance one simulation tick; `now` is simulation time in ms."""
+        self.prev_x, self.prev_y = self.x, self.y
         # If target died, kill projectile
         if not self.target.is_alive():
             self.alive = False
@@ -26,23 +60,144 @@ class Projectile:
         dx = self.target.x - self.x
         dy = self.target.y - self.y
         dist = (dx*dx + dy*dy) ** 0.5
-        if dist <= self.speed:
-            self.hit()
+        step = self.speed * step_scale
+        if dist <= step:
+            self.hit(now)
             return
 
         dx /= dist; dy /= dist
-        self.x += dx * self.speed
-        self.y += dy * self.speed
-        self.rect.center = (self.x, self.y)
+        self.x += dx * step
+        self.y += dy * step
+
+    def schedule(self, clock, impact_tick, ix, iy):
+        self.clock = clock
+        self.fire_tick, self.impact_tick = clock.ticks, impact_tick
+        self.impact_x, self.impact_y = ix, iy
 
-    def hit(self):
+    def land(self, now):
+        """Resolve a scheduled shot at its impact tick."""
+        self.x, self.y = self.impact_x, self.impact_y
+        if self.target.is_alive():
+            self.hit(now)
+        self.alive = False
+
+    def hit(self, now):
         # Damage
         self.target.take_damage(self.damage)
         # Apply slow if any
         if self.slow_effect is not None:
-            now = pygame.time.get_ticks()
             self.target.apply_slow(self.slow_effect, self.slow_duration, now)
         self.alive = False
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect)
+    def draw(self, screen, alpha=1.0):
+        if self.clock is not None:
+            span = max(self.impact_tick - self.fire_tick, 1)
+            f = min((self.clock.ticks + alpha - self.fire_tick) / span, 1.0)
+            x = self.x + (self.impact_x - self.x) * f
+            y = self.y + (self.impact_y - self.y) * f
+        else:
+            x = self.prev_x + (self.x - self.prev_x) * alpha
+            y = self.prev_y + (self.y - self.prev_y) * alpha
+        image = self.image
+        return screen.blit(image, image.get_rect(center=(x, y)))
+
+
+class ProjectilePool:
+    """Recycles Projectile objects instead of allocating one per shot.
+
+    `spawn` reuses a free slot when there is one; `sweep` moves every
+    dead projectile back to the free list in one compaction pass. The
+    `allocated` / `recycled` counters show whether steady-state play
+    still allocates.
+    """
+
+    def __init__(self):
+        self.active    = []
+        self._free     = []
+        self.allocated = 0
+        self.recycled  = 0
+
+    def spawn(self, *args, **kwargs):
+        if self._free:
+            p = self._free.pop()
+            p.reset(*args, **kwargs)
+            self.recycled += 1
+        else:
+            p = Projectile(*args, **kwargs)
+            self.allocated += 1
+        self.active.append(p)
+        return p
+
+    def sweep(self):
+        """Drop dead projectiles from `active`; returns how many."""
+        live, free = [], self._free
+        for p in self.active:
+            if p.alive:
+                live.append(p)
+            else:
+                p.target = None   # don't keep dead enemies reachable
+                free.append(p)
+        swept = len(self.active) - len(live)
+        self.active = live
+        return swept
+
+    def clear(self):
+        for p in self.active:
+            p.target = None
+        self._free.extend(self.active)
+        self.active = []
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def __len__(self):
+        return len(self.active)
+
+
+class HitScheduler:
+    """Resolves shots analytically instead of homing them tick by tick.
+
+    Towers call `spawn` exactly as on a ProjectilePool. In "predictive"
+    mode the impact time is solved from the target's route when the shot
+    fires; in "instant" mode the shot lands on the next tick. Either way
+    the hit is pushed onto a heap keyed by impact tick, so a shot costs
+    O(log n) however long it flies. Pooled projectiles are still handed
+    out, but only so the renderer can draw the flight.
+    """
+
+    def __init__(self, pool, clock, mode="predictive"):
+        self.pool  = pool
+        self.clock = clock
+        self.mode  = mode
+        self._heap = []
+        self._seq  = 0
+
+    def spawn(self, x, y, target, damage, speed=5, *args, **kwargs):
+        if self.mode == "instant":
+            t, ix, iy = 1, target.x, target.y
+        else:
+            scale = self.clock.step_scale
+            hit = target.route.intercept(target.distance, target.speed * scale,
+                                         x, y, speed * scale)
+            if hit is None:
+                return None   # target reaches the goal before any shot could
+            t, ix, iy = hit
+
+        p = self.pool.spawn(x, y, target, damage, speed, *args, **kwargs)
+        impact = self.clock.ticks + max(1, math.ceil(t))
+        p.schedule(self.clock, impact, ix, iy)
+        heapq.heappush(self._heap, (impact, self._seq, p))
+        self._seq += 1
+        return p
+
+    def resolve(self, now):
+        """Land every shot due by the current tick; returns them."""
+        landed, heap, tick = [], self._heap, self.clock.ticks
+        while heap and heap[0][0] <= tick:
+            p = heapq.heappop(heap)[2]
+            p.land(now)
+            landed.append(p)
+        return landed
+
+    def clear(self):
+        self._heap.clear()
@@ -0,0 +1,68 @@
+import pygame
+
+class DirtyRectRenderer:
+    """Redraws only the screen regions that changed since the last frame.
+
+    Each frame starts by restoring last frame's sprite rectangles from the
+    pre-rendered background, callers `mark` every rectangle they draw,
+    and `end_frame` pushes old + new rectangles with display.update().
+    When the dirty area grows past `max_dirty_ratio` of the screen (or a
+    full-screen overlay calls `invalidate`) it falls back to a full flip.
+    """
+
+    def __init__(self, screen, background, max_dirty_ratio=0.35):
+        self.screen          = screen
+        self.background      = background
+        self.max_dirty_ratio = max_dirty_ratio
+
+        self._dirty     = []     # drawn this frame
+        self._prev      = []     # drawn last frame, to erase
+        self._full      = False  # this frame needs a full flip
+        self._prev_full = True   # first frame is always a full redraw
+
+        # Fill-rate counters (pixels pushed to the display)
+        self.pixels_pushed   = 0
+        self.full_flips      = 0
+        self.partial_updates = 0
+
+    def set_background(self, background):
+        self.background = background
+        self.invalidate()
+
+    def begin_frame(self):
+        if self._prev_full:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for r in self._prev:
+                self.screen.blit(self.background, r, r)
+
+    def mark(self, rect):
+        if rect:
+            self._dirty.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        """Force a full-screen redraw for this frame and the next one."""
+        self._full = True
+
+    def end_frame(self):
+        screen_rect = self.screen.get_rect()
+        if not (self._full or self._prev_full):
+            rects = [r.clip(screen_rect) for r in self._prev + self._dirty]
+            rects = [r for r in rects if r.w and r.h]
+            area  = sum(r.w * r.h for r in rects)
+            if area > self.max_dirty_ratio * screen_rect.w * screen_rect.h:
+                self._full = True
+            else:
+                pygame.display.update(rects)
+                self.pixels_pushed   += area
+                self.partial_updates += 1
+
+        if self._full or self._prev_full:
+            pygame.display.flip()
+            self.pixels_pushed += screen_rect.w * screen_rect.h
+            self.full_flips    += 1
+
+        self._prev_full = self._full
+        self._prev      = self._dirty
+        self._dirty     = []
+        self._full      = False
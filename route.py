@@ -0,0 +1,128 @@
+import math
+from bisect import bisect_right
+
+
+class Route:
+    """Arc-length parameterization of a pixel path.
+
+    Built once per map and shared read-only by every enemy on it. An
+    enemy only tracks the scalar distance it has travelled; position is a
+    segment lookup plus interpolation, and progress and time-to-goal
+    comparisons are exact and O(1).
+    """
+
+    def __init__(self, points):
+        if not points:
+            raise ValueError("Enemy path is empty. Ensure your TMX map defines a proper path.")
+        self.points = [tuple(map(float, p)) for p in points]
+
+        self.seg_len = []     # length of segment i (points[i] -> points[i+1])
+        self.unit    = []     # unit direction of segment i
+        self.cum     = [0.0]  # distance from the start to points[i]
+        for (x0, y0), (x1, y1) in zip(self.points, self.points[1:]):
+            dx, dy = x1 - x0, y1 - y0
+            d = math.hypot(dx, dy)
+            self.seg_len.append(d)
+            self.unit.append((dx / d, dy / d) if d else (0.0, 0.0))
+            self.cum.append(self.cum[-1] + d)
+        self.length = self.cum[-1]
+
+    def __len__(self):
+        return len(self.points)
+
+    def locate(self, s, hint=0):
+        """Index of the last waypoint at or before distance `s`.
+
+        Scans forward from `hint`, so callers that move monotonically
+        (every enemy) pay amortized O(1) per step.
+        """
+        cum, last = self.cum, len(self.points) - 1
+        i = hint
+        while i < last and cum[i + 1] <= s:
+            i += 1
+        return i
+
+    def segment_at(self, s):
+        return min(max(bisect_right(self.cum, s) - 1, 0), len(self.points) - 1)
+
+    def position(self, s, seg):
+        """Pixel position at distance `s`, given its segment index."""
+        if seg >= len(self.unit):
+            return self.points[-1]
+        x0, y0 = self.points[seg]
+        ux, uy = self.unit[seg]
+        d = s - self.cum[seg]
+        return x0 + ux * d, y0 + uy * d
+
+    def position_at(self, s):
+        return self.position(s, self.segment_at(s))
+
+    def direction(self, seg):
+        return self.unit[min(seg, len(self.unit) - 1)] if self.unit else (0.0, 0.0)
+
+    def remaining(self, s):
+        return max(self.length - s, 0.0)
+
+    def time_to_goal(self, s, speed):
+        """Ticks left to reach the goal at constant `speed` px/tick."""
+        return self.remaining(s) / speed if speed > 0 else math.inf
+
+    def intercept(self, s, speed, ox, oy, shot_speed):
+        """Earliest (t, x, y) at which a shot fired now from (ox, oy) at
+        `shot_speed` px/tick meets an enemy at distance `s` moving at
+        `speed` px/tick, or None if the enemy reaches the goal first.
+
+        On segment k the enemy is at C + u*v*t, with C its position
+        extrapolated back to t=0, so the meeting time is the smallest
+        root of |C - O + u*v*t| = w*t within that segment's time span.
+        """
+        if shot_speed <= 0:
+            return None
+        if speed <= 0:
+            # enemy is standing still: straight shot
+            x, y = self.position_at(s)
+            return math.hypot(x - ox, y - oy) / shot_speed, x, y
+
+        w2 = shot_speed * shot_speed
+        for k in range(self.segment_at(s), len(self.unit)):
+            (px, py), (ux, uy) = self.points[k], self.unit[k]
+            back = s - self.cum[k]
+            dx, dy = px + ux * back - ox, py + uy * back - oy
+            t0 = max(0.0, (self.cum[k] - s) / speed)
+            t1 = (self.cum[k + 1] - s) / speed
+            t = _first_root(speed * speed - w2,
+                            2 * speed * (dx * ux + dy * uy),
+                            dx * dx + dy * dy, t0, t1)
+            if t is not None:
+                return t, dx + ox + ux * speed * t, dy + oy + uy * speed * t
+        return None
+
+
+def ahead(a, b):
+    """True if enemy `a` is closer to its goal than enemy `b`.
+
+    Enemies on the same route compare the distance walked; across routes
+    of different lengths, the distance left to walk.
+    """
+    if a.route is b.route:
+        return a.distance > b.distance
+    return a.route.length - a.distance < b.route.length - b.distance
+
+
+def _first_root(a, b, c, t0, t1):
+    """Smallest t in [t0, t1] with a*t^2 + b*t + c == 0, else None."""
+    eps = 1e-9
+    if abs(a) < eps:
+        if abs(b) < eps:
+            return t0 if abs(c) < eps else None
+        roots = (-c / b,)
+    else:
+        disc = b * b - 4 * a * c
+        if disc < 0:
+            return None
+        r = math.sqrt(disc)
+        roots = sorted(((-b - r) / (2 * a), (-b + r) / (2 * a)))
+    for t in roots:
+        if t0 - eps <= t <= t1 + eps:
+            return max(t, t0)
+    return None
@@ -0,0 +1,52 @@
+"""Fixed-timestep clock for the simulation.
+
+Game rules only ever see whole ticks, so outcomes no longer depend on the
+rendered frame rate or machine load. Speed-up modes run more ticks per
+rendered frame instead of taking bigger steps.
+"""
+
+# Enemy and projectile speeds were tuned as pixels per 1/30 s frame
+REFERENCE_RATE = 30
+
+
+class FixedClock:
+    def __init__(self, tick_rate=REFERENCE_RATE, speed=1, max_frame_ms=250):
+        self.tick_rate    = tick_rate
+        self.tick_ms      = 1000.0 / tick_rate
+        self.speed        = speed
+        # cap on real time consumed per frame, so a long stall cannot
+        # trigger a spiral of catch-up ticks
+        self.max_frame_ms = max_frame_ms
+
+        self.ticks        = 0
+        self._accumulator = 0.0
+
+    @property
+    def time_ms(self):
+        """Simulated milliseconds since the clock started."""
+        return self.ticks * self.tick_ms
+
+    @property
+    def step_scale(self):
+        """Per-tick movement scale relative to REFERENCE_RATE."""
+        return REFERENCE_RATE / self.tick_rate
+
+    @property
+    def alpha(self):
+        """Fraction of the next tick already elapsed, for interpolation."""
+        return self._accumulator / self.tick_ms
+
+    def advance(self, frame_ms):
+        """Feed real frame time; returns how many ticks to run now."""
+        self._accumulator += min(frame_ms, self.max_frame_ms) * self.speed
+        n = int(self._accumulator // self.tick_ms)
+        self._accumulator -= n * self.tick_ms
+        return n
+
+    def tick(self):
+        self.ticks += 1
+        return self.time_ms
+
+    def reset(self):
+        self.ticks        = 0
+        self._accumulator = 0.0
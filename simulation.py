@@ -0,0 +1,404 @@
+from collections import Counter
+
+from enemy import Goblin, Orc, Troll, Boss
+from tower import ArcherTower, CannonTower, MagicTower, IceTower
+from sim_clock import FixedClock
+from enemy_store import EnemyStore
+from spatial import SpatialGrid
+from route import Route
+from projectile import ProjectilePool, HitScheduler
+import tracing
+
+TOWER_TYPES = {
+    "archer": ArcherTower,
+    "cannon": CannonTower,
+    "magic":  MagicTower,
+    "ice":    IceTower,
+}
+TOWER_KINDS = {cls: kind for kind, cls in TOWER_TYPES.items()}
+
+class Simulation:
+    """Display-free game state: spawning, movement, targeting,
+    projectiles, economy and wave progression.
+
+    Advances in fixed ticks of `clock.tick_ms`: `tick()` runs exactly one,
+    `step(frame_ms)` runs however many the accumulator owes. It never
+    opens a window, loads fonts or decodes images, so it can run
+    thousands of games headless.
+
+    Things a front end has to react to are queued as (name, payload)
+    tuples and collected with `drain_events()`:
+
+        ("wave_started", wave)      ("wave_cleared", stats_dict)
+        ("enemy_leaked", enemy)     ("game_over", None)
+        ("victory", None)
+
+        ("tower_placed", info)      ("tower_upgraded", info)
+        ("tower_sold", info)        ("routes_changed", None)
+
+    with `info` a dict of kind, x, y, tower_level and the cost paid
+    (negative for a sale refund).
+
+    With a `maze` (see maze.py) towers may also go on walkable tiles:
+    placements that would seal the route are refused, and every enemy on
+    the field is rerouted from where it stands when the routes change.
+    """
+
+    def __init__(self, path, tower_points,
+                 base_enemy_types=None,
+                 boss_class=None,
+                 start_wave=14,
+                 final_wave=15,
+                 tick_rate=None,
+                 use_enemy_store=False,
+                 projectile_mode="homing",
+                 routes=None,
+                 maze=None):
+        # `path` may be a Route (shared with the Map) or a list of points;
+        # maps with several spawns pass one Route per spawn as `routes`
+        self.route        = path if isinstance(path, Route) else Route(path)
+        self.routes       = list(routes) if routes else [self.route]
+        self.tower_points = tower_points
+
+        # Enemy roster
+        self.base_enemy_types = base_enemy_types or [Goblin, Orc, Troll]
+        self.boss_class       = boss_class or Boss
+        self.enemy_types      = list(self.base_enemy_types)
+
+        # Game state; with use_enemy_store the enemies are thin views onto
+        # NumPy arrays, for stress maps with thousands of live enemies
+        # (the store walks a single path, so single-spawn maps only)
+        if use_enemy_store and maze is not None:
+            raise ValueError("mazing needs per-enemy routes; use_enemy_store walks one path")
+        if use_enemy_store and len(self.routes) > 1:
+            raise ValueError("map has %d spawn routes; use_enemy_store walks one path"
+                             % len(self.routes))
+        self.enemy_store = EnemyStore(self.route) if use_enemy_store else None
+        self.enemies     = self.enemy_store.views if self.enemy_store else []
+        # Bucketed index of live enemies, rebuilt once per tick for targeting
+        self.enemy_index = SpatialGrid()
+        self.projectiles = ProjectilePool()
+        self.towers      = []
+        self.occupied_slots = {}
+        # Mazing: tile each tower standing on the path blocks, by slot
+        self.maze          = maze
+        self.blocked_tiles = {}
+        if maze is not None:
+            self.routes = maze.routes
+
+        self.player_money = 100
+        self.health       = 10
+        self.tower_costs  = {"archer": 30, "cannon": 50, "magic": 40, "ice": 20}
+
+        # Wave control
+        self.wave             = start_wave
+        self.final_wave       = final_wave
+        self.boss_waves       = (5, 10, 15)
+        self.wave_in_progress = False
+        self.victory          = False
+        self.game_over        = False
+        self.manual_wave_trigger = False
+
+        # Spawning: a wave is wave_base + wave * wave_growth enemies
+        self.spawn_timer      = 0
+        self.spawn_interval   = 800
+        self.wave_base        = 5
+        self.wave_growth      = 2
+        self.enemies_to_spawn = 0
+        self.spawned_count    = 0
+        self.is_boss_wave     = False
+
+        # Balance knobs applied to every spawned enemy
+        self.enemy_health_scale = 1.0
+        self.enemy_speed_scale  = 1.0
+
+        # Fixed-timestep clock; speed-ups run more ticks per frame
+        self.clock = FixedClock(tick_rate) if tick_rate else FixedClock()
+
+        # "homing" steps every bullet each tick; "predictive"/"instant"
+        # schedule each hit on a heap when the shot is fired
+        self.projectile_mode = projectile_mode
+        if projectile_mode == "homing":
+            self.launcher = self.projectiles
+        else:
+            self.launcher = HitScheduler(self.projectiles, self.clock, projectile_mode)
+
+        # Optional FrameProfiler (profiler.py); each tick laps its phases
+        self.profiler = None
+
+        self.session_wave_stats = []
+        self._events = []
+        self._reset_wave_stats()
+
+    # ─── Commands ────────────────────────────────────────────
+
+    def request_wave(self):
+        """Ask for the next wave; honoured on the next step."""
+        if not self.wave_in_progress:
+            self.manual_wave_trigger = True
+
+    def place_tower(self, kind, slot, checked=False):
+        """`checked`: a maze tile under `slot` already passed
+        `Maze.can_block` since the grid last changed."""
+        cost = self.tower_costs[kind]
+        if self.player_money < cost or slot in self.occupied_slots:
+            return None
+        if self.maze is not None:
+            tile = self.maze.tile_at(*slot)
+            if self.maze.is_open(*tile):
+                if not self.maze.block(*tile, keep=self.enemy_tiles(), checked=checked):
+                    return None
+                self.blocked_tiles[slot] = tile
+                self._reroute()
+        self.currency_spent += cost
+        self.towers_placed  += 1
+        tw = TOWER_TYPES[kind](*slot)
+        tw.purchase_cost = tw.total_invested = cost
+        self.towers.append(tw)
+        self.occupied_slots[slot] = tw
+        self.player_money -= cost
+        self._tower_event("tower_placed", tw, cost)
+        return tw
+
+    def upgrade_tower(self, tower):
+        cost = tower.upgrade_cost
+        if tower.level >= 5 or self.player_money < cost:
+            return False
+        self.currency_spent += cost
+        self.player_money   -= cost
+        tower.upgrade()
+        self._tower_event("tower_upgraded", tower, cost)
+        return True
+
+    def sell_tower(self, tower):
+        refund = tower.get_sell_value()
+        self.player_money += refund
+        for slot, tw in list(self.occupied_slots.items()):
+            if tw is tower:
+                del self.occupied_slots[slot]
+                if slot in self.blocked_tiles:
+                    self.maze.unblock(*self.blocked_tiles.pop(slot))
+                    self._reroute()
+                break
+        self.towers.remove(tower)
+        self._tower_event("tower_sold", tower, -refund)
+
+    def enemy_tiles(self):
+        """Tiles live enemies stand on; a maze may not block these."""
+        return {self.maze.tile_at(e.x, e.y) for e in self.enemies}
+
+    def _reroute(self):
+        if self.maze.routes is self.routes:
+            return
+        # new spawns take the repaired routes; enemies on the field
+        # continue from where they stand
+        self.routes = self.maze.routes
+        self.route  = self.routes[0]
+        for e in self.enemies:
+            route = self.maze.route_from(e.x, e.y)
+            if route is not None:
+                e.route, e.distance, e.current_point = route, 0.0, 0
+        self._events.append(("routes_changed", None))
+
+    def _tower_event(self, name, tower, cost):
+        self._events.append((name, {
+            "kind": TOWER_KINDS.get(type(tower), type(tower).__name__),
+            "x": tower.x, "y": tower.y,
+            "tower_level": tower.level, "cost": cost,
+        }))
+
+    def drain_events(self):
+        events, self._events = self._events, []
+        return events
+
+    @property
+    def time_ms(self):
+        return self.clock.time_ms
+
+    @property
+    def time_multiplier(self):
+        return self.clock.speed
+
+    @time_multiplier.setter
+    def time_multiplier(self, speed):
+        self.clock.speed = speed
+
+    # ─── Stepping ────────────────────────────────────────────
+
+    def start_new_wave(self):
+        self.spawned_count = 0
+        self._reset_wave_stats()
+
+        # Boss waves?
+        if self.wave in self.boss_waves:
+            self.is_boss_wave     = True
+            self.enemy_types      = [self.boss_class] + list(self.base_enemy_types)
+            self.enemies_to_spawn = 1 + (self.wave_base + self.wave * self.wave_growth)
+        else:
+            self.is_boss_wave     = False
+            self.enemy_types      = list(self.base_enemy_types)
+            self.enemies_to_spawn = self.wave_base + self.wave * self.wave_growth
+
+        # first enemy of a wave appears immediately
+        self.spawn_timer = self.time_ms - self.spawn_interval
+        self.wave_in_progress    = True
+        self.manual_wave_trigger = False
+        self._events.append(("wave_started", self.wave))
+
+    def step(self, frame_ms):
+        """Feed `frame_ms` of real time; runs the ticks it adds up to."""
+        for _ in range(self.clock.advance(frame_ms)):
+            if self.victory or self.game_over:
+                return
+            self.tick()
+
+    def tick(self):
+        """Advance the game by exactly one fixed tick."""
+        if self.victory or self.game_over:
+            return
+        now   = self.clock.tick()
+        scale = self.clock.step_scale
+        prof  = self.profiler
+
+        # Handle manual start
+        if not self.wave_in_progress and self.manual_wave_trigger:
+            self.wave += 1
+            if self.wave > self.final_wave:
+                self.victory = True
+                self._events.append(("victory", None))
+                return
+            with tracing.span("start_new_wave", "sim", wave=self.wave):
+                self.start_new_wave()
+
+        # Spawn enemies
+        if self.wave_in_progress and self.spawned_count < self.enemies_to_spawn:
+            if now - self.spawn_timer >= self.spawn_interval:
+                cls = (self.boss_class if self.is_boss_wave and self.spawned_count == 0
+                       else self.enemy_types[self.spawned_count % len(self.enemy_types)])
+                with tracing.span("spawn", "sim", kind=cls.__name__):
+                    self._spawn(cls)
+                self.spawned_count += 1
+                self.spawn_timer = now
+        if prof:
+            prof.lap("spawning")
+
+        # Move enemies
+        if self.enemy_store is not None:
+            self._move_stored_enemies(now, scale)
+        else:
+            self._move_enemies(now, scale)
+        if prof:
+            prof.lap("enemies")
+
+        # Move projectiles, then recycle the dead ones in one pass
+        if self.launcher is self.projectiles:
+            for p in self.projectiles.active:
+                p.update(now, scale)
+                if not p.alive:
+                    self.total_damage += p.damage
+            self.projectiles.sweep()
+        else:
+            landed = self.launcher.resolve(now)
+            for p in landed:
+                self.total_damage += p.damage
+            if landed:
+                self.projectiles.sweep()
+        if prof:
+            prof.lap("projectiles")
+
+        # Towers acquire targets
+        store = self.enemy_store
+        if store is None and any(t.can_shoot(now) for t in self.towers):
+            self.enemy_index.rebuild(self.enemies)
+        for t in self.towers:
+            if store is None:
+                t.shoot(self.enemies, now, self.launcher, self.enemy_index)
+            elif t.can_shoot(now):
+                target = store.best_in_range(t.x, t.y, t.range)
+                if target is not None:
+                    t.attack(target, now, self.launcher)
+        if prof:
+            prof.lap("towers")
+
+        # Wave cleared?
+        if (self.wave_in_progress
+            and self.spawned_count == self.enemies_to_spawn
+            and not self.enemies):
+            stats = {
+                "wave":           self.wave,
+                "enemies":        self.enemies_defeated,
+                "towers_placed":  self.towers_placed,
+                "effectiveness":  round(self.enemies_defeated / max(1, self.towers_placed), 2),
+                "damage":         self.total_damage,
+                "time_ms":        int(now - self._wave_start_time),
+                "currency_spent": self.currency_spent,
+                "kills":          dict(self.kills_by_type),
+            }
+            self.session_wave_stats.append(stats)
+            self._events.append(("wave_cleared", stats))
+            self._reset_wave_stats()
+            self.wave_in_progress = False
+
+    def _spawn(self, cls):
+        hs, ss = self.enemy_health_scale, self.enemy_speed_scale
+        if self.enemy_store is not None:
+            e = self.enemy_store.spawn(cls)
+            if hs != 1.0 or ss != 1.0:
+                e.rescale(hs, ss)
+            return e
+        # spawns take turns feeding the wave
+        e = cls(self.routes[self.spawned_count % len(self.routes)])
+        if hs != 1.0:
+            e.max_health = e.health = int(e.max_health * hs)
+        if ss != 1.0:
+            e.speed = e.original_speed = e.speed * ss
+        self.enemies.append(e)
+        return e
+
+    def _move_enemies(self, now, scale):
+        for e in self.enemies[:]:
+            e.move(now, scale)
+            if not e.alive:
+                self.enemies.remove(e)
+                self.enemies_defeated += 1
+                self.kills_by_type[type(e).__name__] += 1
+                self.player_money   += 10
+            elif e.distance >= e.route.length:
+                self.health -= 1
+                self.enemies.remove(e)
+                self._events.append(("enemy_leaked", e))
+                if self.health <= 0:
+                    self.game_over = True
+                    self._events.append(("game_over", None))
+                    break
+
+    def _move_stored_enemies(self, now, scale):
+        killed, leaked = self.enemy_store.step(now, scale)
+        self.enemies_defeated += len(killed)
+        self.kills_by_type.update(e.kind.__name__ for e in killed)
+        self.player_money     += 10 * len(killed)
+        for e in leaked:
+            self.health -= 1
+            self._events.append(("enemy_leaked", e))
+            if self.health <= 0 and not self.game_over:
+                self.game_over = True
+                self._events.append(("game_over", None))
+
+    def session_summary(self):
+        stats = self.session_wave_stats
+        W = len(stats)
+        return {
+            "Waves":         W,
+            "Enemies":       sum(s["enemies"] for s in stats),
+            "Damage":        sum(s["damage"] for s in stats),
+            "Spent":         sum(s["currency_spent"] for s in stats),
+            "Avg Time (ms)": (sum(s["time_ms"] for s in stats) // W) if W else 0,
+        }
+
+    def _reset_wave_stats(self):
+        self.enemies_defeated = 0
+        self.kills_by_type    = Counter()
+        self.towers_placed    = 0
+        self.total_damage     = 0
+        self.currency_spent   = 0
+        self._wave_start_time = self.time_ms
@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from route import ahead
+
+
+class SpatialGrid:
+    """Uniform-grid bucket index of live enemies.
+
+    Rebuilt once per simulation tick; towers then only look at the cells
+    overlapping their range instead of scanning every enemy. Distances
+    are compared squared and the best target is picked with a running
+    max, so a query never sorts.
+    """
+
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self.buckets   = defaultdict(list)
+
+    def rebuild(self, enemies):
+        self.buckets.clear()
+        cs = self.cell_size
+        buckets = self.buckets
+        for e in enemies:
+            if e.alive:
+                buckets[(int(e.x // cs), int(e.y // cs))].append(e)
+
+    def _cells(self, x, y, radius):
+        cs = self.cell_size
+        buckets = self.buckets
+        for cx in range(int((x - radius) // cs), int((x + radius) // cs) + 1):
+            for cy in range(int((y - radius) // cs), int((y + radius) // cs) + 1):
+                bucket = buckets.get((cx, cy))
+                if bucket:
+                    yield bucket
+
+    def best_in_range(self, x, y, radius):
+        """Enemy in range with the least path left to walk, or None."""
+        r2 = radius * radius
+        best = None
+        for bucket in self._cells(x, y, radius):
+            for e in bucket:
+                dx, dy = e.x - x, e.y - y
+                if dx*dx + dy*dy <= r2 and (best is None or ahead(e, best)):
+                    best = e
+        return best
+
+    def first_in_range(self, x, y, radius):
+        """Any enemy in range, or None."""
+        r2 = radius * radius
+        for bucket in self._cells(x, y, radius):
+            for e in bucket:
+                dx, dy = e.x - x, e.y - y
+                if dx*dx + dy*dy <= r2:
+                    return e
+        return None
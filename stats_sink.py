@@ -0,0 +1,167 @@
+"""Append-only wave statistics, written off the render thread.
+
+`write()` only queues a record; a background thread appends everything
+queued to disk in batches. The CSV sink never rewrites history: when the
+active file holds `segment_rows` records it is renamed to a numbered
+segment and a fresh one is started,
+
+    game_stats.csv  ->  game_stats.1.csv  ->  game_stats.2.csv  ...
+
+keeping `keep_segments` old segments. stats_viewer.py's CsvSource reads
+the segments back, oldest first.
+"""
+import atexit
+import csv
+import os
+import queue
+import threading
+
+import tracing
+
+# (stats key, CSV column) for each recorded field
+COLUMNS = [
+    ("wave",           "Wave"),
+    ("enemies",        "Enemies Defeated"),
+    ("towers_placed",  "Towers Placed"),
+    ("effectiveness",  "Placement Effectiveness"),
+    ("damage",         "Damage Dealt"),
+    ("time_ms",        "Wave Time (ms)"),
+    ("currency_spent", "Currency Spent"),
+]
+HEADER = [col for _, col in COLUMNS]
+
+_STOP = object()
+
+
+class BackgroundWriter:
+    """Queue plus a daemon thread that drains it in batches.
+
+    Subclasses implement `_open`, `_write_batch(records)` and `_close`;
+    all three run on the writer thread, so file or database handles
+    never cross threads. Queued records are flushed at interpreter exit.
+    """
+
+    def __init__(self, name="stats-writer"):
+        self._queue  = queue.Queue()
+        self._closed = False
+        self.errors  = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record):
+        """Queue one record; never blocks on I/O."""
+        if not self._closed:
+            self._queue.put(record)
+
+    def flush(self):
+        """Block until everything queued so far is written."""
+        self._queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        self._open()
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            # take whatever else piled up while we were blocked
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not _STOP]
+            stop = len(records) != len(batch)
+            if records:
+                try:
+                    with tracing.span("write_batch", "stats", records=len(records)):
+                        self._write_batch(records)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"[Stats Error] {e}")
+            for _ in batch:
+                self._queue.task_done()
+        self._close()
+
+    def _open(self):
+        pass
+
+    def _write_batch(self, records):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class CsvStatsSink(BackgroundWriter):
+    """Wave stats as rolling CSV segments of `segment_rows` records."""
+
+    def __init__(self, path="game_stats.csv", segment_rows=50, keep_segments=20):
+        self.path          = path
+        self.segment_rows  = segment_rows
+        self.keep_segments = keep_segments
+        self._file  = None
+        self._rows  = 0
+        super().__init__(name="csv-stats")
+
+    def _open(self):
+        if os.path.exists(self.path):
+            with open(self.path, newline="") as f:
+                self._rows = max(sum(1 for _ in f) - 1, 0)
+            self._file = open(self.path, "a", newline="")
+        else:
+            self._start_segment()
+
+    def _start_segment(self):
+        self._file = open(self.path, "w", newline="")
+        csv.writer(self._file).writerow(HEADER)
+        self._rows = 0
+
+    def _rotate(self):
+        self._file.close()
+        oldest = segment_path(self.path, self.keep_segments)
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for k in range(self.keep_segments - 1, 0, -1):
+            src = segment_path(self.path, k)
+            if os.path.exists(src):
+                os.replace(src, segment_path(self.path, k + 1))
+        if self.keep_segments:
+            os.replace(self.path, segment_path(self.path, 1))
+        self._start_segment()
+
+    def _write_batch(self, records):
+        for stats in records:
+            if self._rows >= self.segment_rows:
+                self._rotate()
+            csv.writer(self._file).writerow([stats[key] for key, _ in COLUMNS])
+            self._rows += 1
+        self._file.flush()
+
+    def _close(self):
+        if self._file:
+            self._file.close()
+
+
+def segment_path(path, k):
+    """Path of the k-th newest rotated segment (0 is the active file)."""
+    if k == 0:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{k}{ext}"
+
+
+_shared = {}
+
+
+def shared_sink(path="game_stats.csv"):
+    """One sink per file for the whole process, reused across restarts."""
+    if path not in _shared:
+        _shared[path] = CsvStatsSink(path)
+    return _shared[path]
@@ -1,12 +1,384 @@
+import argparse
+import csv
+import os
 import tkinter as tk
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import islice
 from tkinter import ttk
 import pandas as pd
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import parquet_export
+from stats_sink import COLUMNS, segment_path
+from telemetry import connect
 
-def main():
-    # Load CSV data
-    df = pd.read_csv("game_stats.csv")
+# Per level and wave averages, aggregated in SQLite rather than pandas
+WAVE_QUERY = """
+SELECT level                      AS "Level",
+       wave                       AS "Wave",
+       COUNT(DISTINCT session_id) AS "Sessions",
+       AVG(enemies)               AS "Enemies Defeated",
+       AVG(towers_placed)         AS "Towers Placed",
+       AVG(effectiveness)         AS "Placement Effectiveness",
+       AVG(damage)                AS "Damage Dealt",
+       AVG(time_ms)               AS "Wave Time (ms)",
+       AVG(currency_spent)        AS "Currency Spent"
+FROM waves {where}
+GROUP BY level, wave
+ORDER BY level, wave
+"""
+
+KILLS_QUERY = """
+SELECT k.enemy_type, SUM(k.count)
+FROM kills k JOIN sessions s ON s.id = k.session_id {where}
+GROUP BY k.enemy_type
+ORDER BY 2 DESC
+"""
+
+# ─── Row sources ─────────────────────────────────────────────
+
+class FrameSource:
+    """Rows of an already-aggregated DataFrame (--db / --parquet)."""
+
+    def __init__(self, df):
+        self.df      = df
+        self.columns = list(df.columns)
+
+    def __len__(self):
+        return len(self.df)
+
+    def index_step(self):
+        return True
+
+    def rows(self, start, stop):
+        return self.df.iloc[start:stop].values.tolist()
+
+    def frame(self, columns, last=None):
+        df = self.df[columns]
+        return df.tail(last) if last else df
+
+    def close(self):
+        pass
+
+
+class CsvSource:
+    """Rows of the rolling CSV segments, oldest first, by byte offset.
+
+    The offset index is built `chunk_bytes` at a time from `index_step`,
+    so the window can open before a long history has been scanned. Only
+    the rows asked for are ever parsed. The newest file stays open for
+    `poll`, which follows appends and segment rotation; segments the
+    sink has since deleted are closed and their rows dropped.
+    """
+
+    def __init__(self, paths, chunk_bytes=1 << 20):
+        self.paths       = paths
+        self.chunk_bytes = chunk_bytes
+        self._files      = [open(p, "rb") for p in paths]
+        self._file_of    = array("H")   # row -> file number
+        self._offset     = array("Q")   # row -> byte offset in that file
+        self._scan_file  = 0
+        self._scan_pos   = 0
+        self.columns = next(csv.reader([self._files[0].readline().decode()])) if paths else []
+
+    @classmethod
+    def rolling(cls, path="game_stats.csv"):
+        paths, k = [], 0
+        while os.path.exists(segment_path(path, k)):
+            paths.insert(0, segment_path(path, k))
+            k += 1
+        return cls(paths)
+
+    def __len__(self):
+        return len(self._offset)
+
+    def index_step(self):
+        """Index the next chunk; True once every file is indexed."""
+        while self._scan_file < len(self._files):
+            f = self._files[self._scan_file]
+            if self._scan_pos == 0:
+                f.seek(0)
+                self._scan_pos = len(f.readline())   # skip the header
+            f.seek(self._scan_pos)
+            chunk = f.read(self.chunk_bytes)
+            # only index complete lines; a partial one is picked up next time
+            end = chunk.rfind(b"\n") + 1
+            if end:
+                pos = 0
+                while pos < end:
+                    self._file_of.append(self._scan_file)
+                    self._offset.append(self._scan_pos + pos)
+                    pos = chunk.index(b"\n", pos) + 1
+                self._scan_pos += end
+                return False
+            if len(chunk) < self.chunk_bytes:
+                if self._scan_file == len(self._files) - 1:
+                    return True   # caught up; the active file may still grow
+                self._scan_file += 1
+                self._scan_pos = 0
+            else:
+                self._scan_pos += len(chunk)   # pathological overlong line
+        return True
+
+    def poll(self):
+        """Rows appended since the last call, following a rotation of
+        the active file to a numbered segment."""
+        self._drop_deleted()
+        n = len(self)
+        path = self.paths[-1] if self.paths else None
+        rotated = (path is not None and os.path.exists(path) and
+                   os.stat(path).st_ino != os.fstat(self._files[-1].fileno()).st_ino)
+        while not self.index_step():
+            pass
+        if rotated:
+            # our handle now points at a rotated segment, read to the end;
+            # carry on with any newer segments, then the new active file
+            ino = os.fstat(self._files[-1].fileno()).st_ino
+            k = 1
+            while (os.path.exists(segment_path(path, k))
+                   and os.stat(segment_path(path, k)).st_ino != ino):
+                k += 1
+            for j in range(k - 1, -1, -1):
+                self._files.append(open(segment_path(path, j), "rb"))
+                self._scan_file += 1
+                self._scan_pos   = 0
+                while not self.index_step():
+                    pass
+        return self.rows(n, len(self))
+
+    def _drop_deleted(self):
+        # oldest segments rotated off the end by the sink (unlinked, so
+        # only our handle keeps them); never the one still being indexed
+        k = 0
+        while k < self._scan_file and os.fstat(self._files[k].fileno()).st_nlink == 0:
+            self._files[k].close()
+            k += 1
+        if not k:
+            return
+        del self._files[:k]
+        cut = bisect_left(self._file_of, k)
+        del self._file_of[:cut]
+        del self._offset[:cut]
+        for i in range(len(self._file_of)):
+            self._file_of[i] -= k
+        self._scan_file -= k
+
+    def close(self):
+        for f in self._files:
+            f.close()
+        self._files.clear()
+
+    def rows(self, start, stop):
+        out = []
+        for i in range(start, min(stop, len(self))):
+            f = self._files[self._file_of[i]]
+            f.seek(self._offset[i])
+            out.append(next(csv.reader([f.readline().decode()])))
+        return out
+
+    def frame(self, columns, last=None):
+        while not self.index_step():
+            pass
+        n = len(self)
+        start = max(n - last, 0) if last else 0
+        df = pd.DataFrame(self.rows(start, n), columns=self.columns)
+        return df[columns].apply(pd.to_numeric)
+
+
+class DbTailSource:
+    """The newest raw wave rows of a telemetry database, followed with a
+    rowid cursor and held in a bounded window."""
+
+    def __init__(self, path, level=None, window=1000):
+        self.con     = connect(path)
+        self.level   = level
+        self.columns = ["Level"] + [col for _, col in COLUMNS]
+        self.window  = deque(maxlen=window)
+        self.last_rowid = 0
+        # start from the last `window` rows rather than the whole history
+        row = self.con.execute("SELECT MAX(rowid) FROM waves").fetchone()
+        self.last_rowid = max((row[0] or 0) - window, 0)
+        self.poll()
+
+    def __len__(self):
+        return len(self.window)
+
+    def index_step(self):
+        return True
+
+    def poll(self):
+        sql = ("SELECT rowid, level, " + ", ".join(key for key, _ in COLUMNS) +
+               " FROM waves WHERE rowid > ?" + (" AND level = ?" if self.level else "") +
+               " ORDER BY rowid")
+        params = (self.last_rowid, self.level) if self.level else (self.last_rowid,)
+        new = []
+        for rowid, *row in self.con.execute(sql, params):
+            self.last_rowid = rowid
+            new.append(row)
+        self.window.extend(new)
+        return new
+
+    def rows(self, start, stop):
+        return list(islice(self.window, start, stop))
+
+    def frame(self, columns, last=None):
+        df = pd.DataFrame(list(self.window), columns=self.columns)[columns]
+        return df.tail(last) if last else df
+
+    def close(self):
+        self.con.close()
+
+
+def load_db(path, level=None):
+    con = connect(path)
+    where, params = ("WHERE level = ?", (level,)) if level else ("", ())
+    df = pd.read_sql_query(WAVE_QUERY.format(where=where), con, params=params)
+    kwhere = "WHERE s.level = ?" if level else ""
+    kills = con.execute(KILLS_QUERY.format(where=kwhere), params).fetchall()
+    con.close()
+    return df.round(2), kills
+
+def load_parquet(root, level=None):
+    # project only the charted columns; the rest of each file is never read
+    df = parquet_export.read_table(os.path.join(root, "waves"),
+                                   columns=[key for key, _ in COLUMNS], level=level)
+    return df.rename(columns=dict(COLUMNS))
+
+def load_data(args):
+    """(row source, kills) from the first usable source asked for."""
+    if args.parquet and not args.live:
+        try:
+            return FrameSource(load_parquet(args.parquet, args.level)), None
+        except ImportError as e:
+            print(f"{e}; falling back to {args.db or 'game_stats.csv'}")
+    if args.db and args.live:
+        return DbTailSource(args.db, args.level, args.chart_rows or 1000), None
+    if args.db:
+        df, kills = load_db(args.db, args.level)
+        return FrameSource(df), kills
+    return CsvSource.rolling("game_stats.csv"), None
+
+
+# ─── Widgets ─────────────────────────────────────────────────
+
+class VirtualTable(ttk.Frame):
+    """Treeview that only holds the rows currently on screen.
+
+    A fixed pool of items is refilled from `source.rows()` as the
+    scrollbar or mouse wheel moves, so memory and redraw cost depend on
+    the window height, not the number of rows.
+    """
+
+    ROW_HEIGHT = 20
+
+    def __init__(self, master, source):
+        super().__init__(master)
+        self.source = source
+        self.first  = 0
+        self.tree = ttk.Treeview(self, columns=source.columns, show="headings")
+        for col in source.columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=100, anchor="center")
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self._on_scroll)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="right", fill="y")
+        self._items = []
+
+        self.tree.bind("<Configure>", lambda e: self._resize(e.height))
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_to(self.first - e.delta // 120))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.first - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.first + 3))
+
+    @property
+    def visible(self):
+        return len(self._items)
+
+    def _resize(self, height):
+        want = max(1, height // self.ROW_HEIGHT - 1)
+        while len(self._items) < want:
+            self._items.append(self.tree.insert("", "end", values=()))
+        while len(self._items) > want:
+            self.tree.delete(self._items.pop())
+        self.refresh()
+
+    def _on_scroll(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * len(self.source)))
+        elif action == "scroll":
+            step = self.visible if unit == "pages" else 1
+            self.scroll_to(self.first + int(value) * step)
+
+    def scroll_to(self, first):
+        self.first = max(0, min(first, len(self.source) - self.visible))
+        self.refresh()
+
+    def follow(self, old_len):
+        """After rows were appended: stay pinned to the end if we were."""
+        if self.first + self.visible >= old_len:
+            self.scroll_to(len(self.source))
+        else:
+            self.refresh()
+
+    def refresh(self):
+        rows = self.source.rows(self.first, self.first + self.visible)
+        for i, item in enumerate(self._items):
+            self.tree.item(item, values=rows[i] if i < len(rows) else ())
+        n = max(len(self.source), 1)
+        self.scroll.set(self.first / n, min(1.0, (self.first + self.visible) / n))
+
+
+class ChartTab:
+    """A notebook tab whose figure is built the first time it is shown.
+
+    `plot(ax, df)` draws it and returns its artist. With an `update(artist,
+    df)` it is refreshed in place and the axes autoscaled; without one
+    the axes are cleared and redrawn.
+    """
+
+    def __init__(self, notebook, title, columns, plot, update=None):
+        self.frame   = ttk.Frame(notebook)
+        self.columns = columns
+        self.plot    = plot
+        self.update  = update
+        self.canvas  = None
+        self.stale   = True
+        notebook.add(self.frame, text=title)
+
+    def show(self, data):
+        if self.canvas is None:
+            fig = Figure(figsize=(6, 4), dpi=100)
+            self.ax = fig.add_subplot(111)
+            self.artist = self.plot(self.ax, data(self.columns))
+            self.canvas = FigureCanvasTkAgg(fig, master=self.frame)
+            self.canvas.draw()
+            self.canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
+        elif self.stale:
+            df = data(self.columns)
+            if self.update:
+                self.update(self.artist, df)
+                self.ax.relim()
+                self.ax.autoscale_view()
+            else:
+                self.ax.clear()
+                self.artist = self.plot(self.ax, df)
+            self.canvas.draw_idle()
+        self.stale = False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Game statistics dashboard")
+    parser.add_argument("--db", help="read aggregates from a telemetry database")
+    parser.add_argument("--parquet", help="read a parquet_export.py dataset directory")
+    parser.add_argument("--level", help="only this level (with --db or --parquet)")
+    parser.add_argument("--chart-rows", type=int, default=50,
+                        help="most recent rows to chart (0 for all)")
+    parser.add_argument("--live", type=int, nargs="?", const=1000, metavar="MS",
+                        help="follow the CSV or database, polling every MS ms")
+    args = parser.parse_args(argv)
+
+    source, kills = load_data(args)
 
     # Create main window
     root = tk.Tk()
@@ -18,55 +390,80 @@ def main():
     notebook.pack(fill='both', expand=True)
 
     # --- Tab 1: Data Table ---
-    table_frame = ttk.Frame(notebook)
-    notebook.add(table_frame, text="Data Table")
-
-    tree = ttk.Treeview(table_frame, columns=list(df.columns), show='headings')
-    for col in df.columns:
-        tree.heading(col, text=col)
-        tree.column(col, width=100, anchor='center')
-    tree.pack(fill='both', expand=True, padx=10, pady=10)
-
-    for _, row in df.iterrows():
-        tree.insert('', 'end', values=list(row))
-
-    # Helper to create chart tabs
-    def add_chart_tab(title, plot_func):
-        frame = ttk.Frame(notebook)
-        notebook.add(frame, text=title)
-        fig = Figure(figsize=(6, 4), dpi=100)
-        ax = fig.add_subplot(111)
-        plot_func(ax)
-        canvas = FigureCanvasTkAgg(fig, master=frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True, padx=10, pady=10)
+    table = VirtualTable(notebook, source)
+    notebook.add(table, text="Data Table")
+
+    # Index the CSV a chunk at a time between UI events
+    def index_more():
+        done = source.index_step()
+        table.refresh()
+        if not done:
+            root.after(1, index_more)
+    root.after_idle(index_more)
+
+    # Live mode charts a bounded window of the newest rows
+    window = deque(maxlen=args.chart_rows or 1000) if args.live else None
+    seeded = False
+
+    def seed_window():
+        nonlocal seeded
+        if not seeded:
+            seeded = True
+            window.extend(source.frame(source.columns, window.maxlen).values.tolist())
+
+    def chart_data(columns):
+        if window is None:
+            return source.frame(columns, args.chart_rows)
+        seed_window()
+        df = pd.DataFrame(list(window), columns=source.columns)[columns]
+        return df.apply(pd.to_numeric)
+
+    # Chart tabs render the first time they are selected
+    charts = {}
+
+    def add_chart_tab(title, columns, plot, update=None):
+        tab = ChartTab(notebook, title, columns, plot, update)
+        charts[str(tab.frame)] = tab
+
+    def show_selected(event=None):
+        tab = charts.get(notebook.select())
+        if tab is not None:
+            tab.show(chart_data)
+
+    notebook.bind("<<NotebookTabChanged>>", show_selected)
 
     # --- Plot functions ---
-    def plot_enemies(ax):
-        ax.plot(df["Wave"], df["Enemies Defeated"], marker='o')
+    def plot_enemies(ax, df):
         ax.set_title("Enemies Defeated per Wave")
         ax.set_xlabel("Wave")
         ax.set_ylabel("Enemies Defeated")
+        return ax.plot(df["Wave"], df["Enemies Defeated"], marker='o')[0]
+
+    def update_enemies(line, df):
+        line.set_data(df["Wave"], df["Enemies Defeated"])
 
-    def plot_efficiency(ax):
-        ax.scatter(df["Towers Placed"], df["Placement Effectiveness"])
+    def plot_efficiency(ax, df):
         ax.set_title("Placement Efficiency")
         ax.set_xlabel("Towers Placed")
         ax.set_ylabel("Effectiveness")
+        return ax.scatter(df["Towers Placed"], df["Placement Effectiveness"])
 
-    def plot_damage(ax):
-        ax.bar(df["Wave"], df["Damage Dealt"])
+    def update_efficiency(points, df):
+        points.set_offsets(df[["Towers Placed", "Placement Effectiveness"]].values)
+
+    def plot_damage(ax, df):
         ax.set_title("Damage Dealt per Wave")
         ax.set_xlabel("Wave")
         ax.set_ylabel("Damage Dealt")
+        return ax.bar(df["Wave"], df["Damage Dealt"])
 
-    def plot_wave_time(ax):
-        ax.hist(df["Wave Time (ms)"], bins=10)
+    def plot_wave_time(ax, df):
         ax.set_title("Wave Completion Time Distribution")
         ax.set_xlabel("Time (ms)")
         ax.set_ylabel("Frequency")
+        return ax.hist(df["Wave Time (ms)"], bins=10)
 
-    def plot_spending(ax):
+    def plot_spending(ax, df):
         waves  = df["Wave"].astype(str).tolist()
         spends = df["Currency Spent"].tolist()
 
@@ -79,17 +476,46 @@ def main():
         # Option B: Pie chart of spend distribution
         # Uncomment below to use pie instead
         ax.clear()
-        ax.pie(spends, labels=waves, autopct='%1.1f%%')
         ax.set_title("Spend Distribution Across Waves")
+        return ax.pie(spends, labels=waves, autopct='%1.1f%%')
 
     # Add the chart tabs
-    add_chart_tab("Enemies Defeated", plot_enemies)
-    add_chart_tab("Efficiency", plot_efficiency)
-    add_chart_tab("Damage Dealt", plot_damage)
-    add_chart_tab("Wave Time", plot_wave_time)
-    add_chart_tab("Resource Utilization", plot_spending)
+    add_chart_tab("Enemies Defeated", ["Wave", "Enemies Defeated"], plot_enemies, update_enemies)
+    add_chart_tab("Efficiency", ["Towers Placed", "Placement Effectiveness"],
+                  plot_efficiency, update_efficiency)
+    add_chart_tab("Damage Dealt", ["Wave", "Damage Dealt"], plot_damage)
+    add_chart_tab("Wave Time", ["Wave Time (ms)"], plot_wave_time)
+    add_chart_tab("Resource Utilization", ["Wave", "Currency Spent"], plot_spending)
+
+    if kills:
+        def plot_kills(ax, df):
+            ax.set_title("Kills by Enemy Type")
+            ax.set_xlabel("Enemy")
+            ax.set_ylabel("Kills")
+            return ax.bar([k for k, _ in kills], [n for _, n in kills])
+        add_chart_tab("Kills", [], plot_kills)
+
+    # Live mode: pick up new rows, then refresh only what is on screen
+    def poll():
+        seed_window()
+        old_len = len(source)
+        new = source.poll()
+        if new:
+            window.extend(new)
+            table.follow(old_len)
+            for tab in charts.values():
+                tab.stale = True
+            show_selected()
+        root.after(args.live, poll)
+
+    if args.live:
+        if not hasattr(source, "poll"):
+            print("--live needs the CSV or --db; showing a snapshot")
+        else:
+            root.after(args.live, poll)
 
     root.mainloop()
+    source.close()
 
 if __name__ == "__main__":
     main()
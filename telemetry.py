@@ -0,0 +1,227 @@
+"""Optional SQLite telemetry: sessions, waves, tower actions and kills.
+
+Unlike the rolling CSV, every wave ever played is kept and keyed by
+session and level, so runs can be told apart and aggregated in SQL.
+Writes go through the same background thread as the CSV sink; each
+batch of queued records is inserted in a single transaction.
+
+    python telemetry.py --import game_stats.csv   # migrate old CSV data
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import uuid
+from datetime import datetime
+
+from stats_sink import BackgroundWriter, COLUMNS, segment_path
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id          TEXT PRIMARY KEY,
+    level       TEXT,
+    roster      TEXT,
+    started_at  TEXT,
+    ended_at    TEXT,
+    outcome     TEXT,
+    source      TEXT
+);
+CREATE TABLE IF NOT EXISTS waves (
+    session_id      TEXT REFERENCES sessions(id),
+    level           TEXT,
+    wave            INTEGER,
+    enemies         INTEGER,
+    towers_placed   INTEGER,
+    effectiveness   REAL,
+    damage          INTEGER,
+    time_ms         INTEGER,
+    currency_spent  INTEGER,
+    recorded_at     TEXT
+);
+CREATE TABLE IF NOT EXISTS placements (
+    session_id  TEXT REFERENCES sessions(id),
+    wave        INTEGER,
+    action      TEXT,
+    kind        TEXT,
+    x           INTEGER,
+    y           INTEGER,
+    tower_level INTEGER,
+    cost        INTEGER,
+    recorded_at TEXT
+);
+CREATE TABLE IF NOT EXISTS kills (
+    session_id  TEXT REFERENCES sessions(id),
+    wave        INTEGER,
+    enemy_type  TEXT,
+    count       INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_level   ON sessions(level);
+CREATE INDEX IF NOT EXISTS idx_waves_level_wave ON waves(level, wave);
+CREATE INDEX IF NOT EXISTS idx_waves_session    ON waves(session_id);
+CREATE INDEX IF NOT EXISTS idx_placements_sess  ON placements(session_id);
+CREATE INDEX IF NOT EXISTS idx_kills_sess_wave  ON kills(session_id, wave);
+"""
+
+_INSERT = {
+    "session":   "INSERT OR IGNORE INTO sessions (id, level, roster, started_at, source) "
+                 "VALUES (:id, :level, :roster, :started_at, :source)",
+    "end":       "UPDATE sessions SET ended_at = :ended_at, outcome = :outcome WHERE id = :id",
+    "wave":      "INSERT INTO waves VALUES (:session_id, :level, :wave, :enemies, "
+                 ":towers_placed, :effectiveness, :damage, :time_ms, :currency_spent, "
+                 ":recorded_at)",
+    "placement": "INSERT INTO placements VALUES (:session_id, :wave, :action, :kind, "
+                 ":x, :y, :tower_level, :cost, :recorded_at)",
+    "kill":      "INSERT INTO kills VALUES (:session_id, :wave, :enemy_type, :count)",
+}
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def connect(path):
+    """Open (and create or migrate) a telemetry database."""
+    con = sqlite3.connect(path)
+    con.execute("PRAGMA journal_mode = WAL")
+    con.execute("PRAGMA synchronous = NORMAL")
+    if con.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        con.executescript(SCHEMA)
+        con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        con.commit()
+    return con
+
+
+class SQLiteStatsSink(BackgroundWriter):
+    """Telemetry sink; the connection lives on the writer thread.
+
+    `begin_session` opens a session that later wave and tower records
+    are attached to. Wave stats may carry a `kills` dict of enemy type
+    name -> count, which goes to the kills table.
+    """
+
+    def __init__(self, path="game_stats.db"):
+        self.path       = path
+        self.session_id = None
+        self.level      = None
+        self.wave       = 0
+        self._con       = None
+        super().__init__(name="sqlite-stats")
+
+    # ─── Caller side ─────────────────────────────────────────
+
+    def begin_session(self, level, roster=(), source=None):
+        self.session_id = uuid.uuid4().hex
+        self.level      = level
+        self.wave       = 0
+        super().write(("session", {
+            "id": self.session_id, "level": level,
+            "roster": ",".join(roster), "started_at": _now(), "source": source,
+        }))
+        return self.session_id
+
+    def end_session(self, outcome):
+        if self.session_id is None:
+            return
+        super().write(("end", {"id": self.session_id, "ended_at": _now(),
+                               "outcome": outcome}))
+        self.session_id = None
+
+    def write(self, stats):
+        """Record one wave_cleared stats dict for the current session."""
+        self.wave = stats["wave"]
+        row = {key: stats[key] for key, _ in COLUMNS}
+        row.update(session_id=self.session_id, level=self.level, recorded_at=_now())
+        super().write(("wave", row))
+        for enemy_type, count in stats.get("kills", {}).items():
+            super().write(("kill", {"session_id": self.session_id, "wave": self.wave,
+                                    "enemy_type": enemy_type, "count": count}))
+
+    def record_tower(self, action, info):
+        """Record a tower placed/upgraded/sold event payload."""
+        super().write(("placement", dict(info, session_id=self.session_id,
+                                         wave=self.wave, action=action,
+                                         recorded_at=_now())))
+
+    # ─── Writer thread ───────────────────────────────────────
+
+    def _open(self):
+        self._con = connect(self.path)
+
+    def _write_batch(self, records):
+        with self._con:
+            for kind, params in records:
+                self._con.execute(_INSERT[kind], params)
+
+    def _close(self):
+        if self._con:
+            self._con.close()
+
+
+def import_csv(db_path, csv_path="game_stats.csv", level="unknown"):
+    """Migrate the rolling CSV (all its segments) into one session per
+    file set. Re-importing the same CSV path is a no-op."""
+    con = connect(db_path)
+    source = os.path.abspath(csv_path)
+    if con.execute("SELECT 1 FROM sessions WHERE source = ?", (source,)).fetchone():
+        con.close()
+        return 0
+
+    paths, k = [], 0
+    while os.path.exists(segment_path(csv_path, k)):
+        paths.insert(0, segment_path(csv_path, k))
+        k += 1
+    if not paths:
+        con.close()
+        return 0
+
+    session_id = uuid.uuid4().hex
+    stamp = datetime.fromtimestamp(os.path.getmtime(paths[-1])).isoformat(timespec="seconds")
+    n = 0
+    with con:
+        con.execute(_INSERT["session"], {"id": session_id, "level": level, "roster": "",
+                                         "started_at": stamp, "source": source})
+        for p in paths:
+            with open(p, newline="") as f:
+                for rec in csv.DictReader(f):
+                    row = {key: rec[col] for key, col in COLUMNS}
+                    row.update(session_id=session_id, level=level, recorded_at=stamp)
+                    con.execute(_INSERT["wave"], row)
+                    n += 1
+    con.close()
+    return n
+
+
+_shared = {}
+
+
+def shared_store(path="game_stats.db"):
+    """One telemetry sink per database for the whole process."""
+    if path not in _shared:
+        _shared[path] = SQLiteStatsSink(path)
+    return _shared[path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Telemetry database tools")
+    parser.add_argument("--db", default="game_stats.db")
+    parser.add_argument("--import", dest="csv_path", metavar="CSV",
+                        help="import a rolling stats CSV into the database")
+    parser.add_argument("--level", default="unknown",
+                        help="level to file imported rows under")
+    args = parser.parse_args(argv)
+
+    if args.csv_path:
+        n = import_csv(args.db, args.csv_path, args.level)
+        print(f"imported {n} waves from {args.csv_path}")
+    con = connect(args.db)
+    summary = {table: con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+               for table in ("sessions", "waves", "placements", "kills")}
+    con.close()
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""FlowField's incremental updates against a plain BFS on random grids.
+
+    python -m pytest -q test_flow_field.py
+"""
+import random
+from collections import deque
+
+from flow_field import FlowField, INF
+
+
+def bfs(grid, goals):
+    """Goal distances recomputed from scratch, flat like FlowField.dist."""
+    h, w = len(grid), len(grid[0])
+    dist = [INF] * (h * w)
+    queue = deque()
+    for r, c in goals:
+        if grid[r][c] and dist[r * w + c]:
+            dist[r * w + c] = 0
+            queue.append((r, c))
+    while queue:
+        r, c = queue.popleft()
+        d = dist[r * w + c] + 1
+        for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < h and 0 <= nc < w and grid[nr][nc] and dist[nr * w + nc] > d:
+                dist[nr * w + nc] = d
+                queue.append((nr, nc))
+    return dist
+
+
+def random_grid(rng, open_rate):
+    h, w = rng.randint(2, 14), rng.randint(2, 14)
+    grid = [[rng.random() < open_rate for _ in range(w)] for _ in range(h)]
+    goals = [(rng.randrange(h), rng.randrange(w)) for _ in range(rng.randint(1, 3))]
+    return grid, goals
+
+
+def test_build_matches_bfs():
+    rng = random.Random(1)
+    for _ in range(200):
+        grid, goals = random_grid(rng, rng.uniform(0.4, 0.9))
+        assert FlowField(grid, goals).dist == bfs(grid, goals)
+
+
+def test_updates_match_bfs():
+    # random opens and blocks, goals included; every step is compared
+    rng = random.Random(2)
+    for _ in range(300):
+        grid, goals = random_grid(rng, rng.uniform(0.4, 0.9))
+        flow = FlowField(grid, goals)
+        for _ in range(40):
+            r, c = rng.randrange(len(grid)), rng.randrange(len(grid[0]))
+            walkable = rng.random() < 0.5
+            grid[r][c] = walkable
+            flow.set_walkable(r, c, walkable)
+            assert flow.dist == bfs(grid, goals)
+
+
+def test_update_returns_changed_tiles():
+    rng = random.Random(3)
+    for _ in range(100):
+        grid, goals = random_grid(rng, 0.7)
+        flow = FlowField(grid, goals)
+        for _ in range(20):
+            r, c = rng.randrange(len(grid)), rng.randrange(len(grid[0]))
+            before = list(flow.dist)
+            grid[r][c] = not grid[r][c]
+            changed = set(flow.set_walkable(r, c, grid[r][c]))
+            moved = {i for i, (a, b) in enumerate(zip(before, flow.dist)) if a != b}
+            assert moved <= changed
+
+
+def test_trace_steps_down_to_a_goal():
+    rng = random.Random(4)
+    for _ in range(100):
+        grid, goals = random_grid(rng, 0.7)
+        flow = FlowField(grid, goals)
+        for r in range(len(grid)):
+            for c in range(len(grid[0])):
+                path = flow.trace((r, c))
+                if flow.distance(r, c) >= INF:
+                    assert path == []
+                    continue
+                assert len(path) == flow.distance(r, c) + 1
+                assert path[-1] in goals
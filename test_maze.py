@@ -0,0 +1,141 @@
+"""Maze placement checks against a plain BFS on random grids.
+
+    python -m pytest -q test_maze.py
+"""
+import random
+
+from flow_field import FlowField, INF
+from maze import CutIndex, Maze
+from test_flow_field import bfs
+
+
+class GridMap:
+    """Just the parts of Map that Maze uses."""
+
+    def __init__(self, grid, spawns, goals):
+        self.grid        = grid
+        self.height      = len(grid)
+        self.width       = len(grid[0])
+        self.tile_size   = 40
+        self.spawn_tiles = spawns
+        self.goal_tiles  = goals
+        self.flow        = FlowField(grid, goals)
+        self.routes      = []
+
+    def set_walkable(self, r, c, walkable):
+        self.grid[r][c] = walkable
+        self.flow.set_walkable(r, c, walkable)
+
+
+def random_map(rng):
+    h, w = rng.randint(3, 14), rng.randint(3, 14)
+    open_rate = rng.uniform(0.5, 0.9)
+    grid = [[rng.random() < open_rate for _ in range(w)] for _ in range(h)]
+    goals = [(rng.randrange(h), rng.randrange(w)) for _ in range(rng.randint(1, 2))]
+    for r, c in goals:
+        grid[r][c] = True
+    reachable = reached(grid, goals)
+    spawns = rng.sample(sorted(reachable), min(2, len(reachable)))
+    return GridMap(grid, spawns, goals)
+
+
+def reached(grid, goals):
+    w = len(grid[0])
+    return {divmod(i, w) for i, d in enumerate(bfs(grid, goals)) if d < INF}
+
+
+def cut_off(m, r, c):
+    """Tiles that reach a goal now and would not with (r, c) blocked."""
+    before = reached(m.grid, m.goal_tiles)
+    m.grid[r][c] = False
+    after = reached(m.grid, m.goal_tiles)
+    m.grid[r][c] = True
+    return before - after - {(r, c)}
+
+
+def built(flow):
+    index = CutIndex(flow)
+    for _ in index._build:
+        pass
+    return index
+
+
+def test_cut_index_matches_bfs():
+    rng = random.Random(1)
+    for _ in range(120):
+        m = random_map(rng)
+        index, w = built(m.flow), m.width
+        reachable = reached(m.grid, m.goal_tiles)
+        for r in range(m.height):
+            for c in range(m.width):
+                if not m.grid[r][c] or (r, c) in m.goal_tiles:
+                    continue
+                lost = cut_off(m, r, c)
+                for t in reachable - {(r, c)}:
+                    assert index.separates(r * w + c, {t[0] * w + t[1]}) == (t in lost)
+
+
+def test_ring_test_never_passes_a_cut():
+    rng = random.Random(2)
+    for _ in range(150):
+        m = random_map(rng)
+        maze = Maze(m)
+        for r in range(m.height):
+            for c in range(m.width):
+                if m.grid[r][c] and (r, c) not in m.goal_tiles and maze._locally_redundant(r, c):
+                    assert not cut_off(m, r, c)
+
+
+def test_trial_matches_bfs():
+    rng = random.Random(3)
+    for _ in range(120):
+        m = random_map(rng)
+        maze, w = Maze(m, trial_nodes=10 ** 9), m.width
+        reachable = sorted(reached(m.grid, m.goal_tiles))
+        for r in range(m.height):
+            for c in range(m.width):
+                if not m.grid[r][c] or (r, c) in m.goal_tiles:
+                    continue
+                tiles = set(rng.sample(reachable, min(3, len(reachable)))) - {(r, c)}
+                flat = {tr * w + tc for tr, tc in tiles}
+                assert maze._trial(r * w + c, flat) == tiles.isdisjoint(cut_off(m, r, c))
+
+
+def test_trial_refuses_when_out_of_budget():
+    # one long corridor: every block seals the far end
+    grid = [[True] * 60]
+    m = GridMap(grid, [(0, 0)], [(0, 59)])
+    assert Maze(m, trial_nodes=10)._trial(30, {0}) is None
+    assert Maze(m)._trial(30, {0}) is False
+
+
+def test_placements_keep_every_enemy_routed():
+    # index and trial paths, blocks and sales, against a BFS each step
+    rng = random.Random(4)
+    for _ in range(60):
+        m = random_map(rng)
+        maze = Maze(m, index_budget_ms=0)   # the index only grows when built here
+        for step in range(40):
+            reachable = reached(m.grid, m.goal_tiles)
+            keep = {rng.choice(sorted(reachable))}
+            r, c = rng.randrange(m.height), rng.randrange(m.width)
+            if step % 2:
+                for _ in maze.index._build:
+                    pass
+            else:
+                maze.index = CutIndex(m.flow)
+            tiles = keep | set(m.spawn_tiles)
+            expected = bool(m.grid[r][c] and (r, c) not in tiles
+                            and (r, c) not in m.goal_tiles
+                            and tiles.isdisjoint(cut_off(m, r, c)))
+            assert maze.can_block(r, c, keep) == expected
+            if expected and rng.random() < 0.5:
+                # an enemy stepping onto the tile meanwhile still blocks it
+                assert not maze.block(r, c, keep | {(r, c)}, checked=True)
+                assert maze.block(r, c, keep, checked=True)
+                assert m.flow.dist == bfs(m.grid, m.goal_tiles)
+            elif rng.random() < 0.2:
+                closed = [(a, b) for a in range(m.height) for b in range(m.width)
+                          if not m.grid[a][b]]
+                if closed:
+                    maze.unblock(*rng.choice(closed))
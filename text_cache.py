@@ -0,0 +1,60 @@
+"""Rendered text, rasterized once per distinct (font, string, colour).
+
+HUD labels, button captions and stat lines repeat frame after frame, so
+`text_cache.render` hands back the Surface from last time and only
+rasterizes when the text actually changes (money ticks, wave advances).
+Fonts come from `get_font`, which opens each (name, size) once.
+"""
+from collections import OrderedDict
+
+import pygame
+
+_fonts = {}
+
+
+def get_font(name=None, size=24):
+    """Shared Font for `name` (a system font name, or None for pygame's
+    default) at `size`, created on first use."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(None, size) if name is None else pygame.font.SysFont(name, size)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """LRU of rendered text Surfaces keyed by (font, text, colour,
+    antialias), holding at most `max_entries`."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self.hits        = 0
+        self.misses      = 0
+        self._entries    = OrderedDict()   # key -> Surface
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self._entries.get(key)
+        if surf is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surf
+
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        self._entries[key] = surf
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return surf
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+text_cache = TextCache()
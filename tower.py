@@ -1,6 +1,26 @@
 import pygame
+import os
+from atlas import load_atlas, TOWER_ROOT, TOWER_SIZE
+from route import ahead
+
+_tower_images = {}
+
+def load_tower_image(filename, size=TOWER_SIZE):
+    """Shared, pre-scaled tower sprite; sliced from the atlas when built."""
+    key = (filename, size)
+    if key not in _tower_images:
+        # one atlas read covers every tower sprite
+        sheet = load_atlas("towers", size) or {}
+        for name, frames in sheet.items():
+            _tower_images.setdefault((name, size), frames[0])
+    if key not in _tower_images:
+        img = pygame.image.load(os.path.join(TOWER_ROOT, filename))
+        _tower_images[key] = pygame.transform.scale(img, (size, size))
+    return _tower_images[key]
 
 class Tower:
+    image_file = None
+
     def __init__(self, x, y, base_cost=50):
         self.x = x
         self.y = y
@@ -8,7 +28,7 @@ class Tower:
         # Combat stats
         self.range = 100
         self.damage = 10
-        self.fire_rate = 60  # frames between shots
+        self.fire_rate = 60  # simulation ms between shots
         self.last_shot_time = 0
 
         # Upgrade tracking
@@ -19,30 +39,46 @@ class Tower:
         self.purchase_cost  = base_cost
         self.total_invested = base_cost
 
+    # Sprite is resolved on first draw so headless simulations skip decoding
+    @property
+    def image(self):
+        return load_tower_image(self.image_file)
+
+    @property
+    def rect(self):
+        return self.image.get_rect(center=(self.x, self.y))
+
     def draw(self, screen):
-        screen.blit(self.image, self.rect)
+        return screen.blit(self.image, self.rect)
 
-    def can_shoot(self, current_time, time_multiplier):
-        return (current_time - self.last_shot_time) >= (self.fire_rate / time_multiplier)
+    def can_shoot(self, current_time):
+        return (current_time - self.last_shot_time) >= self.fire_rate
 
     def in_range(self, enemy):
         dx, dy = self.x - enemy.x, self.y - enemy.y
-        return (dx*dx + dy*dy)**0.5 <= self.range
+        return dx*dx + dy*dy <= self.range * self.range
 
-    def shoot(self, enemies, current_time, projectiles, time_multiplier=1.0):
-        if not self.can_shoot(current_time, time_multiplier):
-            return
-        candidates = [e for e in enemies if e.alive and self.in_range(e)]
-        if not candidates:
+    def shoot(self, enemies, current_time, projectiles, index=None):
+        """Fire at a target if off cooldown. `index` is an optional
+        SpatialGrid of the same enemies, used instead of a full scan."""
+        if not self.can_shoot(current_time):
             return
+        target = self.acquire_target(enemies, index)
+        if target is not None:
+            self.attack(target, current_time, projectiles)
+
+    def acquire_target(self, enemies, index=None):
         # target the enemy closest to the base
-        candidates.sort(key=lambda e: e.current_point, reverse=True)
-        self.attack(candidates[0], current_time, projectiles)
+        if index is not None:
+            return index.best_in_range(self.x, self.y, self.range)
+        best = None
+        for e in enemies:
+            if e.alive and self.in_range(e) and (best is None or ahead(e, best)):
+                best = e
+        return best
 
     def attack(self, enemy, current_time, projectiles):
-        from projectile import Projectile
-        proj = Projectile(self.x, self.y, enemy, self.damage)
-        projectiles.append(proj)
+        projectiles.spawn(self.x, self.y, enemy, self.damage)
         self.last_shot_time = current_time
 
     def upgrade(self):
@@ -66,61 +102,58 @@ class Tower:
 
 
 class ArcherTower(Tower):
+    image_file = "archer_tower.png"
+
     def __init__(self, x, y):
         super().__init__(x, y, base_cost=30)
         self.damage   = 15
         self.fire_rate = 40
-        img = pygame.image.load("assets/tower/archer_tower.png")
-        self.image = pygame.transform.scale(img, (50, 50))
-        self.rect  = self.image.get_rect(center=(x, y))
 
 
 class CannonTower(Tower):
+    image_file = "tower.png"
+
     def __init__(self, x, y):
         super().__init__(x, y, base_cost=50)
         self.damage   = 30
         self.fire_rate = 90
         self.range    = 120
-        img = pygame.image.load("assets/tower/tower.png")
-        self.image = pygame.transform.scale(img, (50, 50))
-        self.rect  = self.image.get_rect(center=(x, y))
 
 
 class MagicTower(Tower):
+    image_file = "magic_tower.png"
+
     def __init__(self, x, y):
         super().__init__(x, y, base_cost=40)
         self.damage   = 20
         self.fire_rate = 60
-        img = pygame.image.load("assets/tower/magic_tower.png")
-        self.image = pygame.transform.scale(img, (50, 50))
-        self.rect  = self.image.get_rect(center=(x, y))
 
 
 class IceTower(Tower):
+    image_file = "ice_tower.png"
+
     def __init__(self, x, y):
         super().__init__(x, y, base_cost=20)
         self.damage        = 0     # no direct damage
         self.fire_rate     = 50
         self.slow_effect   = 0.5   # 50% speed
         self.slow_duration = 3000  # ms
-        img = pygame.image.load("assets/tower/ice_tower.png")
-        self.image = pygame.transform.scale(img, (50, 50))
-        self.rect  = self.image.get_rect(center=(x, y))
 
-    def shoot(self, enemies, current_time, projectiles, time_multiplier=1.0):
-        if current_time - self.last_shot_time < (self.fire_rate / time_multiplier):
-            return
+    def acquire_target(self, enemies, index=None):
+        if index is not None:
+            return index.first_in_range(self.x, self.y, self.range)
         for e in enemies:
             if self.in_range(e):
-                from projectile import Projectile
-                proj = Projectile(
-                    self.x, self.y, e,
-                    damage=self.damage,
-                    speed=7,
-                    slow_effect=self.slow_effect,
-                    slow_duration=self.slow_duration
-                )
-                proj.image.fill((0, 191, 255))
-                projectiles.append(proj)
-                self.last_shot_time = current_time
-                break
+                return e
+        return None
+
+    def attack(self, enemy, current_time, projectiles):
+        projectiles.spawn(
+            self.x, self.y, enemy,
+            damage=self.damage,
+            speed=7,
+            slow_effect=self.slow_effect,
+            slow_duration=self.slow_duration,
+            style="ice"
+        )
+        self.last_shot_time = current_time
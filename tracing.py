@@ -0,0 +1,146 @@
+"""Session timeline capture as Chrome trace-event JSON (Perfetto,
+chrome://tracing).
+
+While a `Tracer` is active, frame phases (via the FrameProfiler laps),
+wave starts, spawns, asset loads, stats writes and map loads are kept as
+complete ("X") events in a bounded buffer: once it holds `capacity`
+events the oldest are dropped, so a tracer can be left on for a whole
+session. `frame_every` keeps every Nth frame and `sample_rate` the given
+fraction of the other spans, to keep the cost down in production.
+
+The buffer is written out by `dump()`: at exit, and on F9 in game.
+
+    TD_TRACE=trace.json TD_TRACE_FRAMES=4 TD_TRACE_SAMPLE=0.25 python main_menu.py
+
+Instrumented code calls `span()`, which is a shared no-op context while
+no tracer is active.
+"""
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+
+active = None
+_NULL = nullcontext()
+
+
+class Tracer:
+    def __init__(self, path="trace.json", capacity=200_000, frame_every=1,
+                 sample_rate=1.0, dump_on_exit=True):
+        self.path        = path
+        self.frame_every = max(1, int(frame_every))
+        self.sample_rate = sample_rate
+        self.events      = deque(maxlen=capacity)
+        self.frames      = 0
+        self.dumps       = 0
+        self._pid        = os.getpid()
+        self._t0         = time.perf_counter_ns()
+        self._rng        = random.Random()
+        self._threads    = {}
+        self._dump_lock  = threading.Lock()
+        self._written    = 0     # newest dump on disk, by number
+        if dump_on_exit:
+            atexit.register(self.dump)
+
+    def sampled(self):
+        return self.sample_rate >= 1.0 or self._rng.random() < self.sample_rate
+
+    def sample_frame(self):
+        """Whether the frame about to start is recorded."""
+        self.frames += 1
+        return self.frames % self.frame_every == 0
+
+    def complete(self, name, cat, start_ns, end_ns, args=None):
+        """Record a span from two perf_counter_ns readings."""
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        event = {"name": name, "cat": cat, "ph": "X", "pid": self._pid, "tid": tid,
+                 "ts": (start_ns - self._t0) / 1000, "dur": (end_ns - start_ns) / 1000}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def dump(self, path=None, background=False):
+        """Write the buffer as trace-event JSON; returns the path. With
+        `background` the file is written on a separate thread.
+
+        Dumps are written one at a time, to a temporary file swapped in
+        whole, and one overtaken by a later dump is dropped, so the file
+        is always a complete trace."""
+        path = path or self.path
+        events = list(self.events)
+        meta = [{"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid,
+                 "args": {"name": name}} for tid, name in list(self._threads.items())]
+        self.dumps += 1
+        number = self.dumps
+
+        def write():
+            with self._dump_lock:
+                if number < self._written:
+                    return
+                tmp = f"{path}.{os.getpid()}.tmp"
+                try:
+                    with open(tmp, "w") as f:
+                        json.dump({"traceEvents": meta + events, "displayTimeUnit": "ms"}, f)
+                    os.replace(tmp, path)
+                    self._written = number
+                except OSError as e:
+                    print(f"[Trace Error] {e}")
+        if background:
+            threading.Thread(target=write, name="trace-dump").start()
+        else:
+            write()
+        return path
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer, self.name, self.cat, self.args = tracer, name, cat, args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+
+
+def span(name, cat="game", **args):
+    """Context manager timing one span, if a tracer is active and this
+    span is sampled."""
+    tr = active
+    if tr is None or not tr.sampled():
+        return _NULL
+    return _Span(tr, name, cat, args)
+
+
+def start(path="trace.json", **options):
+    """Make a Tracer the active one; see Tracer for the options."""
+    global active
+    active = Tracer(path, **options)
+    return active
+
+
+def stop():
+    global active
+    active = None
+
+
+def start_from_env(environ=os.environ):
+    """Start tracing if TD_TRACE names an output file. TD_TRACE_FRAMES,
+    TD_TRACE_SAMPLE and TD_TRACE_EVENTS set frame_every, sample_rate and
+    capacity."""
+    path = environ.get("TD_TRACE")
+    if not path:
+        return None
+    return start(path,
+                 frame_every=int(environ.get("TD_TRACE_FRAMES", 1)),
+                 sample_rate=float(environ.get("TD_TRACE_SAMPLE", 1.0)),
+                 capacity=int(environ.get("TD_TRACE_EVENTS", 200_000)))